@@ -0,0 +1,24 @@
+"""add token_signing_alg to oauth_apps
+
+Revision ID: 3c9e7d1a5b20
+Revises: 8effab1c2e12
+Create Date: 2026-10-18 10:12:04.118530
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e7d1a5b20'
+down_revision: Union[str, None] = '8effab1c2e12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('oauth_apps', sa.Column('token_signing_alg', sa.String(length=10), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('oauth_apps', 'token_signing_alg')
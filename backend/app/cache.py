@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUTTLCache(Generic[V]):
+    """Bounded LRU cache with a per-entry TTL.
+
+    get, put and eviction are O(1): entries live in an OrderedDict in
+    least-recently-used order. Expired entries are dropped when read, and
+    put() also drops expired entries sitting at the LRU end.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # type: OrderedDict[Hashable, Tuple[float, V]]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_entry(self, key: Hashable) -> Optional[Tuple[float, V]]:
+        """Return (stored_at, value) if present and unexpired, else None."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.time() - entry[0] >= self.ttl:
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self.get_entry(key)
+        return entry[1] if entry is not None else None
+
+    def put(self, key: Hashable, value: V, stored_at: Optional[float] = None) -> None:
+        now = time.time()
+        self._data[key] = (now if stored_at is None else stored_at, value)
+        self._data.move_to_end(key)
+        # Drop expired entries at the cold end before evicting live ones
+        while self._data:
+            oldest_key, (oldest_at, _) = next(iter(self._data.items()))
+            if now - oldest_at < self.ttl or oldest_key == key:
+                break
+            del self._data[oldest_key]
+            self.expirations += 1
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
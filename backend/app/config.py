@@ -8,13 +8,71 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     database_url: str = "postgresql+asyncpg://uzaxirr@localhost:5432/oauth_provider"
     database_url_sync: str = "postgresql://uzaxirr@localhost:5432/oauth_provider"
+    # Async engine connection pool, per worker process (SQLAlchemy's defaults).
+    # Each worker can hold pool_size + max_overflow connections per engine
+    # (the read replica gets its own pool) plus one LISTEN connection; keep
+    # workers x that total under Postgres max_connections when raising them.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0  # seconds to wait for a connection
+    db_pool_recycle: int = 1800  # seconds; -1 disables
+    # Off by default: a ping costs a round trip per checkout, and
+    # db_pool_recycle already retires connections before idle timeouts
+    db_pool_pre_ping: bool = False
+    # asyncpg per-connection prepared statement LRU (0 disables, e.g. behind
+    # pgbouncer in transaction mode)
+    db_prepared_statement_cache_size: int = 500
+    # Optional read replica for read-only paths (introspection, userinfo,
+    # discovery, scope listing); falls back to the primary while its replay
+    # lag exceeds the threshold or the lag check fails
+    database_read_url: str = ""
+    read_replica_max_lag_seconds: float = 2.0
+    read_replica_check_interval_seconds: float = 5.0
+    read_replica_check_timeout_seconds: float = 1.0
     cors_origins: List[str] = ["http://localhost:5173"]
     token_expiry_seconds: int = 3600
+
+    # Verify /oauth/userinfo bearer tokens locally (signature + exp + revoked-jti
+    # set + app still registered) instead of looking up access_tokens on every call.
+    userinfo_local_verification: bool = False
+    revocation_sync_interval_seconds: float = 5.0
+
+    # Queue access_tokens inserts and write them in batches (every N ms or M
+    # rows). Queued tokens are only visible to introspection on the issuing
+    # worker until their batch commits.
+    token_write_behind: bool = False
+    token_write_behind_interval_ms: int = 50
+    token_write_behind_batch_size: int = 500
     issuer: str = "http://localhost:8000"
     keys_dir: str = "keys"
     uploads_dir: str = "uploads"
     rsa_private_key: Optional[str] = None  # base64-encoded PEM
     rsa_public_key: Optional[str] = None  # base64-encoded PEM
+    ec_private_key: Optional[str] = None  # base64-encoded PEM (P-256, for ES256)
+    ed25519_private_key: Optional[str] = None  # base64-encoded PEM (for EdDSA)
+
+    # Token signing: every algorithm listed gets a key published in the JWKS;
+    # signing_algorithm is the default for apps that don't choose one.
+    signing_algorithms: List[str] = ["RS256"]
+    signing_algorithm: str = "RS256"
+
+    # Client secret verification runs bcrypt in a dedicated thread pool
+    bcrypt_max_workers: int = 4
+    # Successful client credential checks are cached briefly (0 disables)
+    client_auth_cache_ttl_seconds: float = 60.0
+    client_auth_cache_max: int = 1024
+
+    # Cross-worker cache invalidation via Postgres LISTEN/NOTIFY
+    cache_invalidation_enabled: bool = True
+    # Upper bound on OAuthApp snapshot staleness if a notification is lost
+    app_registry_ttl_seconds: float = 300.0
+    # Scope/claim definition caches; edits propagate via invalidation, so this
+    # only bounds staleness if a notification is lost (60s while the listener
+    # is disabled or disconnected)
+    definition_cache_ttl_seconds: float = 21600.0
+
+    # Cache-Control max-age for discovery documents and the JWKS
+    wellknown_max_age_seconds: int = 300
 
     # Session management
     session_secret: str  # Required — no default. Set OAUTH_SESSION_SECRET env var.
@@ -32,6 +90,37 @@ class Settings(BaseSettings):
     discord_guild_id: str = ""
     discord_redirect_uri: str = "http://localhost:8000/auth/discord/callback"
     discord_cache_ttl_seconds: int = 300  # 5-minute TTL for live Discord data
+    # Past the TTL above, member data is served stale while it refreshes in
+    # the background, until this hard limit. Stale roles still gate scopes,
+    # so keep it close to the soft TTL (a revoked role lingers at most this long)
+    discord_cache_hard_ttl_seconds: int = 600
+    discord_member_cache_max: int = 50000
+    # Where live Discord data is cached: "memory" (per worker), "sqlite"
+    # (shared file, tmpfs by default) or "redis" (needs the redis package)
+    discord_cache_backend: str = "memory"
+    discord_cache_path: str = ""
+    discord_cache_redis_prefix: str = "ns-auth:discord:"
+    redis_url: str = "redis://localhost:6379/0"
+    # Push updates from the Discord Gateway into the cache: "" (off),
+    # "gateway" (live websocket; needs the GUILD_MEMBERS privileged intent)
+    # or a path to a recorded JSONL event file to replay. With the "memory"
+    # backend every worker runs its own consumer; with a shared backend,
+    # enable it on one worker only.
+    discord_gateway_source: str = ""
+    # Page through the guild member list on startup to pre-fill the cache
+    # for every known user (also available as warm_discord_cache.py)
+    discord_warmup_on_startup: bool = False
+
+    # Shared Discord HTTP client (one pool for the app's lifetime)
+    discord_http2: bool = True
+    discord_timeout_seconds: float = 5.0
+    discord_max_connections: int = 100
+    discord_max_keepalive_connections: int = 20
+    discord_keepalive_expiry_seconds: float = 30.0
+    # 429 handling: retry up to this many times, unless Discord asks us to
+    # wait longer than the cap (then the call fails as before)
+    discord_max_retries: int = 3
+    discord_max_retry_after_seconds: float = 10.0
 
     model_config = {"env_prefix": "OAUTH_", "env_file": ".env"}
 
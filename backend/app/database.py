@@ -1,11 +1,179 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import greenlet
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from app import metrics
 from app.config import settings
 
-engine = create_async_engine(settings.database_url, echo=False)
+logger = logging.getLogger(__name__)
+
+
+class _InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout queued for a connection.
+
+    Only _do_get is timed, minus any new connection it opened, so the wait
+    metric excludes pre-ping and connection setup.
+    """
+
+    stats = {}  # type: Dict[str, Any]  # per-engine subclass, see _create_engine
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # greenlet → ms spent opening connections during its current checkout.
+        # Keyed per greenlet because checkouts interleave while one waits.
+        self._checkouts = {}  # type: Dict[Any, float]
+
+    def _do_get(self):
+        current = greenlet.getcurrent()
+        if current in self._checkouts:
+            # QueuePool retries by calling _do_get again; time the outer call only
+            return super()._do_get()
+        self._checkouts[current] = 0.0
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        finally:
+            connect_ms = self._checkouts.pop(current)
+            waited = (time.perf_counter() - start) * 1000 - connect_ms
+            self.stats["checkouts"] += 1
+            self.stats["wait_ms_total"] += waited
+            if waited > self.stats["wait_ms_max"]:
+                self.stats["wait_ms_max"] = waited
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            connect_ms = (time.perf_counter() - start) * 1000
+            self.stats["connects"] += 1
+            current = greenlet.getcurrent()
+            if current in self._checkouts:
+                self._checkouts[current] += connect_ms
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    # A subclass per engine so its stats survive pool recreation (dispose)
+    stats = {"checkouts": 0, "connects": 0, "timeouts": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+    pool_class = type("InstrumentedPool", (_InstrumentedPool,), {"stats": stats})
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=pool_class,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={"prepared_statement_cache_size": settings.db_prepared_statement_cache_size},
+    )
+
+
+def _pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    stats = type(pool).stats
+    checkouts = stats["checkouts"]
+    capacity = pool.size() + max(settings.db_max_overflow, 0)
+    checked_out = pool.checkedout()
+    return dict(
+        stats,
+        wait_ms_avg=stats["wait_ms_total"] / checkouts if checkouts else 0.0,
+        size=pool.size(),
+        checked_out=checked_out,
+        overflow=pool.overflow(),
+        capacity=capacity,
+        saturation=checked_out / capacity if capacity else 0.0,
+    )
+
+
+engine = _create_engine(settings.database_url)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+read_engine = _create_engine(settings.database_read_url) if settings.database_read_url else None  # type: Optional[AsyncEngine]
+read_session = (
+    async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False) if read_engine is not None else None
+)
+
+# Replica health, refreshed every read_replica_check_interval_seconds by a
+# lifespan background task so no request ever waits on the lag check
+_replica = {"healthy": False, "lag_seconds": None, "checked_at": 0.0, "checks": 0, "fallbacks": 0}
+_replica_task = None  # type: Optional[asyncio.Task]
+
+# 0 while the replica has replayed everything it received; otherwise the age
+# of the last replayed transaction. NULL (not in recovery) counts as no lag.
+_REPLICA_LAG_SQL = text(
+    "SELECT COALESCE(CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END, 0)"
+)
+
+
+async def _measure_replica_lag() -> float:
+    async with read_engine.connect() as conn:
+        return float((await conn.execute(_REPLICA_LAG_SQL)).scalar())
+
+
+async def _check_replica() -> None:
+    _replica["checks"] += 1
+    try:
+        # An unreachable replica can hang in connect for far longer than
+        # the check interval; give up and treat it as unhealthy
+        lag = await asyncio.wait_for(_measure_replica_lag(), settings.read_replica_check_timeout_seconds)
+    except Exception:
+        logger.warning("Read replica lag check failed; using the primary", exc_info=True)
+        _replica["healthy"], _replica["lag_seconds"] = False, None
+    else:
+        _replica["healthy"] = lag <= settings.read_replica_max_lag_seconds
+        _replica["lag_seconds"] = lag
+    _replica["checked_at"] = time.monotonic()
+
+
+async def _replica_monitor_loop() -> None:
+    while True:
+        await _check_replica()
+        await asyncio.sleep(settings.read_replica_check_interval_seconds)
+
+
+def start_replica_monitor() -> None:
+    global _replica_task
+    if read_engine is not None and _replica_task is None:
+        _replica_task = asyncio.create_task(_replica_monitor_loop())
+
+
+async def stop_replica_monitor() -> None:
+    global _replica_task
+    if _replica_task is not None:
+        _replica_task.cancel()
+        try:
+            await _replica_task
+        except asyncio.CancelledError:
+            pass
+        _replica_task = None
+
+
+def _replica_usable() -> bool:
+    # A result the monitor hasn't refreshed in three intervals is not trusted
+    fresh = time.monotonic() - _replica["checked_at"] < settings.read_replica_check_interval_seconds * 3
+    return _replica["healthy"] and fresh
+
+
+def is_read_replica(session: AsyncSession) -> bool:
+    return read_engine is not None and session.bind is read_engine
+
+
+metrics.register("db_pool", lambda: _pool_stats(engine))
+if read_engine is not None:
+    metrics.register("db_read_replica", lambda: dict(_pool_stats(read_engine), **_replica))
+
 
 class Base(DeclarativeBase):
     pass
@@ -14,3 +182,15 @@ class Base(DeclarativeBase):
 async def get_db() -> AsyncSession:
     async with async_session() as session:
         yield session
+
+
+async def get_read_db() -> AsyncSession:
+    """Session for read-only paths: the replica when configured and caught up."""
+    factory = async_session
+    if read_session is not None:
+        if _replica_usable():
+            factory = read_session
+        else:
+            _replica["fallbacks"] += 1
+    async with factory() as session:
+        yield session
@@ -1,29 +1,60 @@
 from contextlib import asynccontextmanager
 from pathlib import Path
+from uuid import UUID
 
-from fastapi import FastAPI, Request, Response
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app import database, metrics
 from app.config import settings
+from app.database import get_db
 from app.routers import apps, auth, oauth, scope_admin, scopes, uploads, wellknown
 from app.security.keys import get_private_key
+from app.services import (
+    discord_gateway, discord_service, discord_warmup, invalidation, revocation_service, token_writer, user_service,
+)
 
 limiter = Limiter(key_func=get_remote_address, default_limits=["60/minute"])
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Generate RSA keys on startup if they don't exist
+    # Load (or generate) signing keys on startup
     get_private_key()
     # Ensure uploads directory exists
     Path(settings.uploads_dir).mkdir(parents=True, exist_ok=True)
+    # One pooled HTTP client for all Discord API calls
+    await discord_service.start_client()
+    # Apply Discord Gateway member/role events to the cache as they arrive
+    discord_gateway.start()
+    # Pre-fill the member cache in the background after a deploy
+    if settings.discord_warmup_on_startup:
+        discord_warmup.start()
+    # Keep the revoked-jti set in sync for local userinfo verification
+    if settings.userinfo_local_verification:
+        revocation_service.start_sync()
+    # Listen for cache invalidations published by other workers
+    if settings.cache_invalidation_enabled:
+        invalidation.start_listener()
+    if settings.token_write_behind:
+        token_writer.start()
+    # Track read replica lag off the request path (no-op without a replica)
+    database.start_replica_monitor()
     yield
+    await database.stop_replica_monitor()
+    await token_writer.stop()
+    await discord_gateway.stop()
+    await discord_warmup.stop()
+    await invalidation.stop_listener()
+    await revocation_service.stop_sync()
+    await discord_service.close_client()
 
 
 app = FastAPI(
@@ -52,7 +83,7 @@ Lets third-party apps request NS user data via standard OAuth scopes — the sam
 
 - **User auth**: Discord OAuth2 (NS guild membership required)
 - **Sessions**: HS256 JWT in httponly cookie (`ns_session`)
-- **Access tokens**: RS256 JWT (auto-generated RSA keys)
+- **Access tokens**: JWT signed with RS256, ES256 or EdDSA (keys auto-generated, all published in the JWKS)
 - **Client auth**: `client_secret` verified via bcrypt
 """,
     version="1.0.0",
@@ -132,3 +163,15 @@ async def root():
 @app.get("/health", tags=["health"], summary="Health check", description="Returns `{\"status\": \"ok\"}` when the server is running.")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def runtime_metrics(
+    user_id: UUID = Depends(scope_admin.require_session),
+    db: AsyncSession = Depends(get_db),
+):
+    # Pool, replica, cache and rate-limit internals: admins only
+    user = await user_service.get_user_by_id(db, user_id)
+    if not user or not user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return metrics.collect()
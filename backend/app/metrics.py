@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict
+
+# Runtime stats providers, keyed by component name. Each returns a flat dict
+# of counters/gauges; GET /metrics serves the collected snapshot.
+_providers = {}  # type: Dict[str, Callable[[], Dict[str, Any]]]
+
+
+def register(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    _providers[name] = provider
+
+
+def collect() -> Dict[str, Dict[str, Any]]:
+    return {name: provider() for name, provider in _providers.items()}
@@ -29,6 +29,8 @@ class OAuthApp(Base):
     redirect_uris: Mapped[List[str]] = mapped_column(ARRAY(String), default=list)
     icon_url: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     privacy_policy_url: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # JWS alg for this app's tokens; None uses settings.signing_algorithm
+    token_signing_alg: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
     status: Mapped[str] = mapped_column(
         String(20), default="approved", server_default="approved", nullable=False
     )
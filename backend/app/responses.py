@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import orjson
+from starlette.responses import Response
+
+# orjson-backed responses for the OAuth hot paths (/token, /userinfo,
+# /token/introspect). Returning these directly skips FastAPI's
+# jsonable_encoder pass and the stdlib json encoder.
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+# Constant fragments, encoded once
+_BEARER_PREFIX = b'{"token_type":"Bearer",'
+_INACTIVE = b'{"active":false}'
+
+
+def bearer_response(body: Dict[str, Any]) -> Response:
+    """Serialize a token/introspection body with "token_type":"Bearer" prepended.
+
+    body must be non-empty and must not carry its own token_type.
+    """
+    return Response(content=_BEARER_PREFIX + orjson.dumps(body)[1:], media_type="application/json")
+
+
+def inactive_token_response() -> Response:
+    return Response(content=_INACTIVE, media_type="application/json")
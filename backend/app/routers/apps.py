@@ -41,6 +41,7 @@ async def create_app(body: OAuthAppCreate, db: AsyncSession = Depends(get_db), u
     app, client_secret = await app_service.create_app(
         db, body.name, body.description, body.scopes, body.redirect_uris,
         body.icon_url, body.privacy_policy_url, owner_id=user_id,
+        token_signing_alg=body.token_signing_alg,
     )
     return OAuthAppCreated(
         id=app.id,
@@ -52,6 +53,7 @@ async def create_app(body: OAuthAppCreate, db: AsyncSession = Depends(get_db), u
         redirect_uris=app.redirect_uris,
         icon_url=app.icon_url,
         privacy_policy_url=app.privacy_policy_url,
+        token_signing_alg=app.token_signing_alg,
         status=app.status,
         created_at=app.created_at,
         updated_at=app.updated_at,
@@ -158,6 +160,7 @@ async def update_app(app_id: UUID, body: OAuthAppUpdate, db: AsyncSession = Depe
         redirect_uris=body.redirect_uris,
         icon_url=body.icon_url,
         privacy_policy_url=body.privacy_policy_url,
+        token_signing_alg=body.token_signing_alg,
     )
     return app
 
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from urllib.parse import urlencode, urlparse
@@ -162,9 +163,10 @@ async def discord_callback(
 
     discord_id = discord_user["id"]
 
-    # Verify NS guild membership
-    is_member = await discord_service.check_guild_membership(discord_id)
-    if not is_member:
+    # Verify NS guild membership (the member object also seeds the cache below)
+    member_fetched_at = time.time()
+    member = await discord_service.get_guild_member(discord_id)
+    if member is None:
         return RedirectResponse(
             url=f"{login_error_url}?{urlencode({'error': 'not_ns_member'})}",
             status_code=302,
@@ -179,8 +181,8 @@ async def discord_callback(
         email=email,
     )
 
-    # Invalidate cached Discord data so fresh login data takes effect
-    discord_service.invalidate_member_cache(discord_id)
+    # Cache the fresh member data so the first token/userinfo call is a hit
+    await discord_service.cache_member(discord_id, member, fetched_at=member_fetched_at)
 
     # C2: Use a single-use code instead of putting the session token in the URL.
     # The frontend exchanges this code via POST /auth/session/exchange.
@@ -11,8 +11,9 @@ from slowapi.util import get_remote_address
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_db
-from app.services import app_service, authz_service, claim_service, discord_service, scope_service, token_service, user_service
+from app.database import async_session, get_db, get_read_db, is_read_replica
+from app.responses import FastJSONResponse, bearer_response, inactive_token_response
+from app.services import app_service, authz_service, claim_service, discord_service, revocation_service, scope_service, token_service, user_service
 from app.services.claim_resolver import resolve_claims
 from app.services.session_service import get_session_user_id
 
@@ -66,13 +67,13 @@ async def authorize(
     if app.status != "approved":
         return oauth_error("invalid_client", "Application is not approved")
 
-    if redirect_uri not in app.redirect_uris:
+    if redirect_uri not in app.redirect_uri_set:
         return oauth_error("invalid_request", "redirect_uri not registered")
 
     # M2: Validate requested scopes against app's registered scopes (RFC 6749 S3.3)
     requested_scopes = scope.split() if scope else []
     if app.scopes:
-        invalid_scopes = [s for s in requested_scopes if s not in app.scopes]
+        invalid_scopes = [s for s in requested_scopes if s not in app.scope_set]
         if invalid_scopes:
             return oauth_error(
                 "invalid_scope",
@@ -113,7 +114,7 @@ async def authorize(
 async def authorize_info(
     client_id: str = Query(...),
     scope: str = Query("openid"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     app = await app_service.get_app_by_client_id(db, client_id)
     if not app:
@@ -163,13 +164,13 @@ async def authorize_consent(
     if not app:
         return oauth_error("invalid_client", "Unknown client_id")
 
-    if redirect_uri not in app.redirect_uris:
+    if redirect_uri not in app.redirect_uri_set:
         return oauth_error("invalid_request", "redirect_uri not registered")
 
     # M2: Validate requested scopes against app's registered scopes (consent endpoint)
     requested_scopes = scope.split() if scope else []
     if app.scopes:
-        invalid_scopes = [s for s in requested_scopes if s not in app.scopes]
+        invalid_scopes = [s for s in requested_scopes if s not in app.scope_set]
         if invalid_scopes:
             return oauth_error(
                 "invalid_scope",
@@ -239,12 +240,11 @@ async def token(
         requested_scopes = scope.split() if scope else []
         access_token, expires_in = await token_service.issue_token(db, app, requested_scopes)
 
-        return {
+        return bearer_response({
             "access_token": access_token,
-            "token_type": "Bearer",
             "expires_in": expires_in,
             "scope": scope or "",
-        }
+        })
 
     elif grant_type == "authorization_code":
         if not code or not client_id or not redirect_uri:
@@ -265,37 +265,12 @@ async def token(
             client_id=client_id,
             redirect_uri=redirect_uri,
             code_verifier=code_verifier,
+            commit=False,
         )
         if not auth_code:
             return oauth_error("invalid_grant", "Invalid or expired authorization code")
 
-        granted_scopes = auth_code.scope.split() if auth_code.scope else []
-        access_token, expires_in = await token_service.issue_user_token(
-            db, app, auth_code.user_id, granted_scopes
-        )
-
-        response_body = {
-            "access_token": access_token,
-            "token_type": "Bearer",
-            "expires_in": expires_in,
-            "scope": auth_code.scope,
-        }
-
-        if "offline_access" in granted_scopes:
-            rt, _ = await token_service.issue_refresh_token(
-                db, app, auth_code.user_id, granted_scopes
-            )
-            response_body["refresh_token"] = rt
-
-        if "openid" in granted_scopes:
-            user = await user_service.get_user_by_id(db, auth_code.user_id)
-            if user:
-                id_token = await token_service.issue_id_token(
-                    db, app, user, granted_scopes, nonce=auth_code.nonce
-                )
-                response_body["id_token"] = id_token
-
-        return response_body
+        return bearer_response(await token_service.issue_authorization_code_tokens(db, app, auth_code))
 
     elif grant_type == "refresh_token":
         if not refresh_token or not client_id or not client_secret:
@@ -315,7 +290,6 @@ async def token(
         response_body = {
             "access_token": result["access_token"],
             "refresh_token": result["refresh_token"],
-            "token_type": "Bearer",
             "expires_in": result["expires_in"],
             "scope": result["scope"],
         }
@@ -327,7 +301,7 @@ async def token(
                 id_token = await token_service.issue_id_token(db, app, user, granted_scopes)
                 response_body["id_token"] = id_token
 
-        return response_body
+        return bearer_response(response_body)
 
     else:
         return oauth_error(
@@ -352,14 +326,17 @@ Requires a valid Bearer token in the `Authorization` header. The token must have
 )
 async def userinfo(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     auth_header = request.headers.get("Authorization", "")
     if not auth_header.startswith("Bearer "):
         return oauth_error("invalid_request", "Bearer token required", 401)
 
     token_str = auth_header[7:]
-    introspection = await token_service.introspect_token(db, token_str)
+    if settings.userinfo_local_verification and revocation_service.is_ready():
+        introspection = await token_service.verify_token_locally(db, token_str)
+    else:
+        introspection = await token_service.introspect_token(db, token_str)
     if not introspection.get("active"):
         return oauth_error("invalid_token", "Token is invalid or expired", 401)
 
@@ -368,6 +345,9 @@ async def userinfo(
         return oauth_error("invalid_token", "Token has no user context", 401)
 
     user = await user_service.get_user_by_id(db, UUID(user_id_str))
+    if not user and is_read_replica(db):
+        async with async_session() as primary:
+            user = await user_service.get_user_by_id(primary, UUID(user_id_str))
     if not user:
         return oauth_error("invalid_token", "User not found", 401)
 
@@ -397,7 +377,7 @@ async def userinfo(
     )
     claims.update(resolved)
 
-    return claims
+    return FastJSONResponse(claims)
 
 
 @router.post(
@@ -414,7 +394,7 @@ async def introspect(
     token: str = Form(...),
     client_id: str = Form(None),
     client_secret: str = Form(None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # H1: Client auth required (RFC 7662 S2.1)
     if not client_id or not client_secret:
@@ -424,7 +404,9 @@ async def introspect(
         return oauth_error("invalid_client", "Invalid client credentials", 401)
 
     result = await token_service.introspect_token(db, token)
-    return result
+    if not result["active"]:
+        return inactive_token_response()
+    return bearer_response(result)
 
 
 @router.post(
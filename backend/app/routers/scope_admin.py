@@ -209,8 +209,10 @@ async def upload_scope_icon(
             os.remove(old_path)
 
     scope.icon = f"/uploads/{filename}"
+    await scope_service.publish_change(db)
     await db.commit()
     await db.refresh(scope)
+    scope_service._invalidate_cache()
     return scope_service._scope_to_dict(scope)
 
 
@@ -92,12 +92,11 @@ async def upload_icon(
     filepath.parent.mkdir(parents=True, exist_ok=True)
     filepath.write_bytes(data)
 
-    # Delete old icon file if it was an upload
-    _delete_old_icon(app.icon_url)
+    old_icon_url = app.icon_url
+    app = await app_service.set_app_icon(db, app, f"/uploads/{filename}")
 
-    app.icon_url = f"/uploads/{filename}"
-    await db.commit()
-    await db.refresh(app)
+    # Delete old icon file if it was an upload
+    _delete_old_icon(old_icon_url)
     return app
 
 
@@ -124,11 +123,9 @@ async def delete_icon(
     if not app:
         raise HTTPException(status_code=404, detail="App not found")
 
-    _delete_old_icon(app.icon_url)
-
-    app.icon_url = None
-    await db.commit()
-    await db.refresh(app)
+    old_icon_url = app.icon_url
+    app = await app_service.set_app_icon(db, app, None)
+    _delete_old_icon(old_icon_url)
     return app
 
 
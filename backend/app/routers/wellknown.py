@@ -1,23 +1,61 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import hashlib
+import json
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_db
-from app.security.keys import get_jwks
+from app.database import get_read_db
+from app.security.keys import get_jwks, get_signing_algorithms
 from app.services import scope_service
 
 router = APIRouter(tags=["well-known"])
 
+# Relying parties poll these documents constantly, so each is serialized once
+# per version (scope cache version / signing key IDs) and served as bytes with
+# a strong ETag. name → (version, body, etag)
+_documents = {}  # type: Dict[str, Tuple[Hashable, bytes, str]]
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison (RFC 7232 §3.2)
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+
+def _document_response(
+    request: Request, name: str, version: Hashable, build: Callable[[], Dict[str, Any]]
+) -> Response:
+    entry = _documents.get(name)
+    if entry is None or entry[0] != version:
+        body = json.dumps(build(), separators=(",", ":")).encode()
+        entry = (version, body, '"%s"' % hashlib.sha256(body).hexdigest()[:32])
+        _documents[name] = entry
+    _, body, etag = entry
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.wellknown_max_age_seconds}",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.get(
     "/.well-known/jwks.json",
     summary="JSON Web Key Set",
-    description="Returns the public RSA key set used to verify RS256-signed access tokens and ID tokens.",
+    description="Returns the public key set (one key per active signing algorithm) used to verify access tokens and ID tokens.",
 )
-async def jwks():
-    return get_jwks()
+async def jwks(request: Request):
+    keys = get_jwks()
+    version = tuple(key["kid"] for key in keys["keys"])
+    return _document_response(request, "jwks", version, lambda: keys)
 
 
 @router.get(
@@ -25,8 +63,16 @@ async def jwks():
     summary="OAuth 2.0 Authorization Server Metadata",
     description="RFC 8414 metadata document. Returns issuer, endpoints, supported grant types, response types, code challenge methods, scopes, and authentication methods.",
 )
-async def oauth_metadata(db: AsyncSession = Depends(get_db)):
-    scope_names = sorted(await scope_service.get_valid_scope_names(db))
+async def oauth_metadata(request: Request, db: AsyncSession = Depends(get_read_db)):
+    scopes = await scope_service.get_all_scopes(db)
+    return _document_response(
+        request, "oauth-authorization-server", scope_service.get_cache_version(),
+        lambda: _oauth_metadata(scopes),
+    )
+
+
+def _oauth_metadata(scopes: List[Dict]) -> Dict[str, Any]:
+    scope_names = sorted(s["name"] for s in scopes)
     return {
         "issuer": settings.issuer,
         "authorization_endpoint": f"{settings.issuer}/oauth/authorize",
@@ -46,10 +92,18 @@ async def oauth_metadata(db: AsyncSession = Depends(get_db)):
 @router.get(
     "/.well-known/openid-configuration",
     summary="OpenID Connect Discovery",
-    description="OIDC discovery document. Returns issuer, endpoints, supported algorithms (`RS256`), scopes, grant types, and authentication methods. Clients can auto-configure from this URL.",
+    description="OIDC discovery document. Returns issuer, endpoints, supported signing algorithms, scopes, grant types, and authentication methods. Clients can auto-configure from this URL.",
 )
-async def openid_configuration(db: AsyncSession = Depends(get_db)):
-    scope_names = sorted(await scope_service.get_valid_scope_names(db))
+async def openid_configuration(request: Request, db: AsyncSession = Depends(get_read_db)):
+    scopes = await scope_service.get_all_scopes(db)
+    return _document_response(
+        request, "openid-configuration", scope_service.get_cache_version(),
+        lambda: _openid_configuration(scopes),
+    )
+
+
+def _openid_configuration(scopes: List[Dict]) -> Dict[str, Any]:
+    scope_names = sorted(s["name"] for s in scopes)
     return {
         "issuer": settings.issuer,
         "authorization_endpoint": f"{settings.issuer}/oauth/authorize",
@@ -61,7 +115,7 @@ async def openid_configuration(db: AsyncSession = Depends(get_db)):
         "response_types_supported": ["code"],
         "grant_types_supported": ["client_credentials", "authorization_code", "refresh_token"],
         "subject_types_supported": ["public"],
-        "id_token_signing_alg_values_supported": ["RS256"],
+        "id_token_signing_alg_values_supported": get_signing_algorithms(),
         "scopes_supported": scope_names,
         "token_endpoint_auth_methods_supported": ["client_secret_post", "none"],
         "code_challenge_methods_supported": ["S256"],
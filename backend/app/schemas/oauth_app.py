@@ -33,6 +33,7 @@ class OAuthAppCreate(BaseModel):
     redirect_uris: List[str] = Field([], description="Allowed OAuth callback URLs.", examples=[["https://myapp.example.com/callback"]])
     icon_url: Optional[str] = Field(None, description="URL to the app icon (set via icon upload endpoint).")
     privacy_policy_url: Optional[str] = Field(None, description="URL to the app's privacy policy.", examples=["https://myapp.example.com/privacy"])
+    token_signing_alg: Optional[str] = Field(None, description="JWS algorithm for this app's access and ID tokens (RS256, ES256 or EdDSA). Defaults to the server's signing algorithm.", examples=["ES256"])
 
     @field_validator("redirect_uris")
     @classmethod
@@ -48,6 +49,7 @@ class OAuthAppUpdate(BaseModel):
     redirect_uris: Optional[List[str]] = Field(None, description="New redirect URIs.")
     icon_url: Optional[str] = Field(None, description="New icon URL.")
     privacy_policy_url: Optional[str] = Field(None, description="New privacy policy URL.")
+    token_signing_alg: Optional[str] = Field(None, description="New token signing algorithm.")
 
     @field_validator("redirect_uris")
     @classmethod
@@ -67,6 +69,7 @@ class OAuthAppResponse(BaseModel):
     redirect_uris: List[str] = Field(..., description="Registered callback URLs.")
     icon_url: Optional[str] = Field(None, description="App icon URL path.")
     privacy_policy_url: Optional[str] = Field(None, description="Privacy policy URL.")
+    token_signing_alg: Optional[str] = Field(None, description="Token signing algorithm, or null for the server default.")
     status: str = Field("pending", description="Approval status: pending, approved, or rejected.")
     created_at: datetime = Field(..., description="UTC creation timestamp.")
     updated_at: datetime = Field(..., description="UTC last-updated timestamp.")
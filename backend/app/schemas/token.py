@@ -7,7 +7,7 @@ from pydantic import BaseModel, Field
 
 class TokenResponse(BaseModel):
     """OAuth 2.0 token response."""
-    access_token: str = Field(..., description="RS256-signed JWT access token.")
+    access_token: str = Field(..., description="Signed JWT access token (RS256, ES256 or EdDSA).")
     token_type: str = Field("Bearer", description="Token type (always `Bearer`).")
     expires_in: int = Field(..., description="Token lifetime in seconds (default 3600).")
     scope: Optional[str] = Field(None, description="Space-separated granted scopes.")
@@ -0,0 +1,66 @@
+import hashlib
+import hmac
+import secrets
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from app import metrics
+from app.config import settings
+
+# Short-lived record of client credentials that already passed bcrypt, so hot
+# callers (resource servers introspecting tokens) skip the ~200 ms verify.
+# Secrets are only held as an HMAC under a per-process random key.
+_HMAC_KEY = secrets.token_bytes(32)
+_cache = OrderedDict()  # type: OrderedDict[Tuple[str, bytes], Tuple[float, str]]
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _secret_mac(client_secret: str) -> bytes:
+    return hmac.new(_HMAC_KEY, client_secret.encode(), hashlib.sha256).digest()
+
+
+def is_verified(client_id: str, client_secret: str, secret_hash: str) -> bool:
+    """True if this exact secret was verified against secret_hash within the TTL."""
+    key = (client_id, _secret_mac(client_secret))
+    entry = _cache.get(key)
+    if entry is None:
+        _stats["misses"] += 1
+        return False
+    expires_at, cached_hash = entry
+    # A changed hash means the app's secret changed since we verified it
+    if expires_at < time.monotonic() or cached_hash != secret_hash:
+        del _cache[key]
+        _stats["misses"] += 1
+        return False
+    _cache.move_to_end(key)
+    _stats["hits"] += 1
+    return True
+
+
+def remember(client_id: str, client_secret: str, secret_hash: str) -> None:
+    if settings.client_auth_cache_ttl_seconds <= 0:
+        return
+    key = (client_id, _secret_mac(client_secret))
+    _cache[key] = (time.monotonic() + settings.client_auth_cache_ttl_seconds, secret_hash)
+    _cache.move_to_end(key)
+    while len(_cache) > settings.client_auth_cache_max:
+        _cache.popitem(last=False)
+        _stats["evictions"] += 1
+
+
+def invalidate(client_id: str) -> None:
+    """Drop every cached credential for a client (call when the app changes)."""
+    for key in [k for k in _cache if k[0] == client_id]:
+        del _cache[key]
+
+
+def clear() -> None:
+    _cache.clear()
+
+
+def get_stats() -> dict:
+    return dict(_stats, size=len(_cache))
+
+
+metrics.register("client_credential_cache", get_stats)
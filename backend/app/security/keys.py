@@ -1,17 +1,42 @@
 import base64
 import hashlib
+import json
 import os
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature, encode_dss_signature
 
 from app.config import settings
 
-_private_pem = None
-_public_pem = None
-_public_key = None
-_kid = None
+# JWS algorithms we can sign with. Which ones are active (loaded and published
+# in the JWKS) is controlled by settings.signing_algorithms.
+SUPPORTED_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+# alg → (env setting holding base64 PEM, private key filename in keys_dir)
+_KEY_SOURCES = {
+    "RS256": ("rsa_private_key", "private.pem"),
+    "ES256": ("ec_private_key", "ec_private.pem"),
+    "EdDSA": ("ed25519_private_key", "ed25519_private.pem"),
+}
+
+_keys = None  # type: Optional[Dict[str, _SigningKey]]
+_jwks = None  # type: Optional[Dict[str, Any]]
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64url_json(obj: Dict[str, Any]) -> bytes:
+    return _b64url(json.dumps(obj, separators=(",", ":")).encode())
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
 
 
 def _derive_kid(public_pem: bytes) -> str:
@@ -20,81 +45,204 @@ def _derive_kid(public_pem: bytes) -> str:
     return base64.urlsafe_b64encode(digest[:8]).rstrip(b"=").decode()
 
 
-def _ensure_keys():
-    global _private_pem, _public_pem, _public_key, _kid
-    if _private_pem is not None:
-        return
+def _int_to_base64url(n: int, length: Optional[int] = None) -> str:
+    byte_length = length or (n.bit_length() + 7) // 8
+    return _b64url(n.to_bytes(byte_length, "big")).decode()
+
+
+class _SigningKey:
+    """A loaded key pair for one JWS algorithm, with its pre-serialized header."""
+
+    def __init__(self, alg: str, private_pem: bytes, public_pem: bytes) -> None:
+        self.alg = alg
+        self.private_pem = private_pem
+        self.public_pem = public_pem
+        # Parse once; signing reuses the loaded key instead of the PEM bytes
+        self.private_key = serialization.load_pem_private_key(private_pem, password=None)
+        self.public_key = serialization.load_pem_public_key(public_pem)
+        self.kid = _derive_kid(public_pem)
+        self.header_segment = _b64url_json({"alg": alg, "kid": self.kid, "typ": "JWT"})
+
+    def sign(self, data: bytes) -> bytes:
+        if self.alg == "RS256":
+            return self.private_key.sign(data, padding.PKCS1v15(), hashes.SHA256())
+        if self.alg == "ES256":
+            # JWS wants the raw 64-byte r||s form, not DER (RFC 7518 S3.4)
+            r, s = decode_dss_signature(self.private_key.sign(data, ec.ECDSA(hashes.SHA256())))
+            return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+        return self.private_key.sign(data)
+
+    def verify(self, signature: bytes, data: bytes) -> bool:
+        try:
+            if self.alg == "RS256":
+                self.public_key.verify(signature, data, padding.PKCS1v15(), hashes.SHA256())
+            elif self.alg == "ES256":
+                if len(signature) != 64:
+                    return False
+                der = encode_dss_signature(
+                    int.from_bytes(signature[:32], "big"), int.from_bytes(signature[32:], "big")
+                )
+                self.public_key.verify(der, data, ec.ECDSA(hashes.SHA256()))
+            else:
+                self.public_key.verify(signature, data)
+        except InvalidSignature:
+            return False
+        return True
+
+    def to_jwk(self) -> Dict[str, str]:
+        jwk = {"use": "sig", "alg": self.alg, "kid": self.kid}
+        if self.alg == "RS256":
+            numbers = self.public_key.public_numbers()
+            jwk.update(kty="RSA", n=_int_to_base64url(numbers.n), e=_int_to_base64url(numbers.e))
+        elif self.alg == "ES256":
+            numbers = self.public_key.public_numbers()
+            jwk.update(
+                kty="EC",
+                crv="P-256",
+                x=_int_to_base64url(numbers.x, 32),
+                y=_int_to_base64url(numbers.y, 32),
+            )
+        else:
+            raw = self.public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+            jwk.update(kty="OKP", crv="Ed25519", x=_b64url(raw).decode())
+        return jwk
+
+
+def _generate_private_key(alg: str):
+    if alg == "RS256":
+        # L2: 4096-bit RSA keys for new generation
+        return rsa.generate_private_key(public_exponent=65537, key_size=4096)
+    if alg == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    return ed25519.Ed25519PrivateKey.generate()
+
+
+def _public_pem_from_private(private_pem: bytes) -> bytes:
+    private_key = serialization.load_pem_private_key(private_pem, password=None)
+    return private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+
+
+def _load_key(alg: str) -> _SigningKey:
+    env_name, filename = _KEY_SOURCES[alg]
+    env_value = getattr(settings, env_name)
 
     # 1) Try env vars (base64-encoded PEM) — works on ephemeral containers
-    if settings.rsa_private_key and settings.rsa_public_key:
-        _private_pem = base64.b64decode(settings.rsa_private_key)
-        _public_pem = base64.b64decode(settings.rsa_public_key)
+    if env_value:
+        private_pem = base64.b64decode(env_value)
+        if alg == "RS256" and settings.rsa_public_key:
+            public_pem = base64.b64decode(settings.rsa_public_key)
+        else:
+            public_pem = _public_pem_from_private(private_pem)
+        return _SigningKey(alg, private_pem, public_pem)
+
+    # 2) Fall back to file-based keys (local dev)
+    keys_dir = Path(settings.keys_dir)
+    keys_dir.mkdir(exist_ok=True)
+    priv_path = keys_dir / filename
+
+    if priv_path.exists():
+        private_pem = priv_path.read_bytes()
     else:
-        # 2) Fall back to file-based keys (local dev)
-        keys_dir = Path(settings.keys_dir)
-        keys_dir.mkdir(exist_ok=True)
-        priv_path = keys_dir / "private.pem"
+        private_pem = _generate_private_key(alg).private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        priv_path.write_bytes(private_pem)
+        os.chmod(priv_path, 0o600)
+
+    # RS256 keeps its historical public.pem alongside the private key
+    if alg == "RS256":
         pub_path = keys_dir / "public.pem"
+        if not pub_path.exists():
+            pub_path.write_bytes(_public_pem_from_private(private_pem))
+        public_pem = pub_path.read_bytes()
+    else:
+        public_pem = _public_pem_from_private(private_pem)
 
-        if priv_path.exists() and pub_path.exists():
-            _private_pem = priv_path.read_bytes()
-            _public_pem = pub_path.read_bytes()
-        else:
-            # L2: 4096-bit RSA keys for new generation
-            private_key = rsa.generate_private_key(public_exponent=65537, key_size=4096)
+    return _SigningKey(alg, private_pem, public_pem)
 
-            _private_pem = private_key.private_bytes(
-                serialization.Encoding.PEM,
-                serialization.PrivateFormat.PKCS8,
-                serialization.NoEncryption(),
-            )
-            _public_pem = private_key.public_key().public_bytes(
-                serialization.Encoding.PEM,
-                serialization.PublicFormat.SubjectPublicKeyInfo,
-            )
 
-            priv_path.write_bytes(_private_pem)
-            pub_path.write_bytes(_public_pem)
-            os.chmod(priv_path, 0o600)
+def _ensure_keys() -> Dict[str, "_SigningKey"]:
+    global _keys
+    if _keys is not None:
+        return _keys
+
+    algorithms = list(dict.fromkeys(settings.signing_algorithms))
+    if settings.signing_algorithm not in algorithms:
+        algorithms.insert(0, settings.signing_algorithm)
+    unsupported = [a for a in algorithms if a not in SUPPORTED_ALGORITHMS]
+    if unsupported:
+        raise ValueError(f"Unsupported signing algorithms: {', '.join(unsupported)}")
 
-    _public_key = serialization.load_pem_public_key(_public_pem)
-    _kid = _derive_kid(_public_pem)
+    _keys = {alg: _load_key(alg) for alg in algorithms}
+    return _keys
+
+
+def _get_signing_key(alg: Optional[str] = None) -> _SigningKey:
+    keys = _ensure_keys()
+    return keys.get(alg or settings.signing_algorithm) or keys[settings.signing_algorithm]
+
+
+def get_signing_algorithms() -> List[str]:
+    """Active signing algorithms, default first."""
+    return list(_ensure_keys())
 
 
 def get_private_key() -> bytes:
-    """Return private key as PEM bytes (for python-jose)."""
-    _ensure_keys()
-    return _private_pem
+    """Return the default signing key's private PEM bytes."""
+    return _get_signing_key().private_pem
 
 
-def get_public_key():
-    """Return cryptography public key object (for JWKS generation)."""
-    _ensure_keys()
-    return _public_key
+def get_signing_key(alg: Optional[str] = None):
+    """Return the loaded cryptography private key object."""
+    return _get_signing_key(alg).private_key
 
 
-def get_kid() -> str:
-    _ensure_keys()
-    return _kid
+def sign_jwt(claims: Dict[str, Any], alg: Optional[str] = None) -> str:
+    """Sign claims as a compact JWT using the cached key and header.
+
+    Uses the key for ``alg`` if it is active, else the default algorithm.
+    """
+    key = _get_signing_key(alg)
+    signing_input = key.header_segment + b"." + _b64url_json(claims)
+    return (signing_input + b"." + _b64url(key.sign(signing_input))).decode()
+
+
+def verify_jwt(token: str) -> Optional[Dict[str, Any]]:
+    """Return the claims of a JWT signed by one of our active keys, else None.
+
+    Only the signature is checked; callers validate exp/iss/etc.
+    """
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64url_decode(header_b64))
+        key = _ensure_keys().get(header.get("alg"))
+        if key is None or header.get("kid") != key.kid:
+            return None
+        signing_input = f"{header_b64}.{payload_b64}".encode()
+        if not key.verify(_b64url_decode(signature_b64), signing_input):
+            return None
+        claims = json.loads(_b64url_decode(payload_b64))
+    except (ValueError, TypeError, AttributeError):
+        return None
+    return claims if isinstance(claims, dict) else None
 
 
-def _int_to_base64url(n: int) -> str:
-    byte_length = (n.bit_length() + 7) // 8
-    return base64.urlsafe_b64encode(n.to_bytes(byte_length, "big")).rstrip(b"=").decode()
+def get_public_key():
+    """Return the default key's cryptography public key object."""
+    return _get_signing_key().public_key
+
+
+def get_kid() -> str:
+    return _get_signing_key().kid
 
 
 def get_jwks() -> dict:
-    pub = get_public_key()
-    numbers = pub.public_numbers()
-    return {
-        "keys": [
-            {
-                "kty": "RSA",
-                "use": "sig",
-                "alg": "RS256",
-                "kid": get_kid(),
-                "n": _int_to_base64url(numbers.n),
-                "e": _int_to_base64url(numbers.e),
-            }
-        ]
-    }
+    global _jwks
+    if _jwks is None:
+        _jwks = {"keys": [key.to_jwk() for key in _ensure_keys().values()]}
+    return _jwks
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from app import metrics
+from app.config import settings
+from app.models.oauth_app import OAuthApp
+
+
+@dataclass(frozen=True)
+class AppSnapshot:
+    """Read-only copy of an OAuthApp row, safe to share across requests."""
+
+    id: uuid.UUID
+    name: str
+    description: Optional[str]
+    client_id: str
+    client_secret_hash: str
+    owner_id: Optional[uuid.UUID]
+    scopes: Tuple[str, ...]
+    redirect_uris: Tuple[str, ...]
+    icon_url: Optional[str]
+    privacy_policy_url: Optional[str]
+    status: str
+    token_signing_alg: Optional[str]
+    # Precomputed for O(1) validation on the authorize/token paths
+    scope_set: FrozenSet[str]
+    redirect_uri_set: FrozenSet[str]
+
+    @classmethod
+    def from_model(cls, app: OAuthApp) -> "AppSnapshot":
+        scopes = tuple(app.scopes or ())
+        redirect_uris = tuple(app.redirect_uris or ())
+        return cls(
+            id=app.id,
+            name=app.name,
+            description=app.description,
+            client_id=app.client_id,
+            client_secret_hash=app.client_secret_hash,
+            owner_id=app.owner_id,
+            scopes=scopes,
+            redirect_uris=redirect_uris,
+            icon_url=app.icon_url,
+            privacy_policy_url=app.privacy_policy_url,
+            status=app.status,
+            token_signing_alg=app.token_signing_alg,
+            scope_set=frozenset(scopes),
+            redirect_uri_set=frozenset(redirect_uris),
+        )
+
+
+# client_id → (loaded_at, snapshot). Unknown client_ids are never cached.
+_registry = {}  # type: Dict[str, Tuple[float, AppSnapshot]]
+# Bumped on every invalidation so a DB read that raced with one isn't stored
+_generation = 0
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def generation() -> int:
+    return _generation
+
+
+def get(client_id: str) -> Optional[AppSnapshot]:
+    entry = _registry.get(client_id)
+    if entry is None or (time.time() - entry[0]) >= settings.app_registry_ttl_seconds:
+        _stats["misses"] += 1
+        return None
+    _stats["hits"] += 1
+    return entry[1]
+
+
+def put(snapshot: AppSnapshot, loaded_generation: int) -> None:
+    if loaded_generation == _generation:
+        _registry[snapshot.client_id] = (time.time(), snapshot)
+
+
+def invalidate(client_id: Optional[str] = None) -> None:
+    """Drop one app (or all apps if client_id is None) from the registry."""
+    global _generation
+    _generation += 1
+    _stats["invalidations"] += 1
+    if client_id is None:
+        _registry.clear()
+    else:
+        _registry.pop(client_id, None)
+
+
+def get_stats() -> dict:
+    return dict(_stats, size=len(_registry))
+
+
+metrics.register("app_registry", get_stats)
@@ -4,12 +4,19 @@ from typing import List, Optional, Tuple
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import async_session, is_read_replica
 from app.models.oauth_app import OAuthApp
-from app.services import scope_service
+from app.services import app_registry, invalidation, scope_service
+from app.services.app_registry import AppSnapshot
+from app.security import credential_cache
 from app.security.hashing import generate_client_id, generate_client_secret, hash_client_secret
+from app.security.keys import get_signing_algorithms
+
+# Built once; SQLAlchemy caches the compiled SQL on first use
+_APP_BY_CLIENT_ID = select(OAuthApp).where(OAuthApp.client_id == bindparam("client_id"))
 
 
 async def _validate_scopes(db: AsyncSession, scopes: List[str]) -> None:
@@ -22,6 +29,30 @@ async def _validate_scopes(db: AsyncSession, scopes: List[str]) -> None:
         )
 
 
+APP_CHANGED_CHANNEL = "oauth_app_changed"
+
+
+def _on_app_changed(client_id: str) -> None:
+    """Drop cached state for an app (all apps if client_id is empty)."""
+    app_registry.invalidate(client_id or None)
+    if client_id:
+        credential_cache.invalidate(client_id)
+    else:
+        credential_cache.clear()
+
+
+invalidation.subscribe(APP_CHANGED_CHANNEL, _on_app_changed)
+
+
+def _validate_signing_alg(alg: str) -> None:
+    active = get_signing_algorithms()
+    if alg not in active:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid token_signing_alg: {alg}. Must be one of: {', '.join(active)}",
+        )
+
+
 async def create_app(
     db: AsyncSession,
     name: str,
@@ -31,8 +62,11 @@ async def create_app(
     icon_url: Optional[str] = None,
     privacy_policy_url: Optional[str] = None,
     owner_id: Optional[UUID] = None,
+    token_signing_alg: Optional[str] = None,
 ) -> Tuple[OAuthApp, str]:
     await _validate_scopes(db, scopes)
+    if token_signing_alg is not None:
+        _validate_signing_alg(token_signing_alg)
     client_id = generate_client_id()
     client_secret = generate_client_secret()
     secret_hash = hash_client_secret(client_secret)
@@ -47,8 +81,10 @@ async def create_app(
         icon_url=icon_url,
         privacy_policy_url=privacy_policy_url,
         owner_id=owner_id,
+        token_signing_alg=token_signing_alg,
     )
     db.add(app)
+    await invalidation.publish(db, APP_CHANGED_CHANNEL, client_id)
     await db.commit()
     await db.refresh(app)
     return app, client_secret
@@ -66,9 +102,26 @@ async def get_app(db: AsyncSession, app_id: UUID) -> Optional[OAuthApp]:
     return await db.get(OAuthApp, app_id)
 
 
-async def get_app_by_client_id(db: AsyncSession, client_id: str) -> Optional[OAuthApp]:
-    result = await db.execute(select(OAuthApp).where(OAuthApp.client_id == client_id))
-    return result.scalar_one_or_none()
+async def get_app_by_client_id(db: AsyncSession, client_id: str) -> Optional[AppSnapshot]:
+    """Read-through lookup via the in-process app registry."""
+    snapshot = app_registry.get(client_id)
+    if snapshot is not None:
+        return snapshot
+
+    if is_read_replica(db):
+        # Registry fills read the primary, so a lagging replica can't re-cache
+        # an app an invalidation just dropped
+        async with async_session() as primary:
+            return await get_app_by_client_id(primary, client_id)
+
+    generation = app_registry.generation()
+    result = await db.execute(_APP_BY_CLIENT_ID, {"client_id": client_id})
+    app = result.scalar_one_or_none()
+    if not app:
+        return None
+    snapshot = AppSnapshot.from_model(app)
+    app_registry.put(snapshot, generation)
+    return snapshot
 
 
 async def update_app(
@@ -80,12 +133,15 @@ async def update_app(
     redirect_uris: Optional[List[str]] = None,
     icon_url: Optional[str] = None,
     privacy_policy_url: Optional[str] = None,
+    token_signing_alg: Optional[str] = None,
 ) -> Optional[OAuthApp]:
     app = await db.get(OAuthApp, app_id)
     if not app:
         return None
     if scopes is not None:
         await _validate_scopes(db, scopes)
+    if token_signing_alg is not None:
+        _validate_signing_alg(token_signing_alg)
     if name is not None:
         app.name = name
     if description is not None:
@@ -98,8 +154,22 @@ async def update_app(
         app.icon_url = icon_url
     if privacy_policy_url is not None:
         app.privacy_policy_url = privacy_policy_url
+    if token_signing_alg is not None:
+        app.token_signing_alg = token_signing_alg
+    await invalidation.publish(db, APP_CHANGED_CHANNEL, app.client_id)
+    await db.commit()
+    await db.refresh(app)
+    _on_app_changed(app.client_id)
+    return app
+
+
+async def set_app_icon(db: AsyncSession, app: OAuthApp, icon_url: Optional[str]) -> OAuthApp:
+    """Point an app at a new (or no) icon and drop every worker's cached copy."""
+    app.icon_url = icon_url
+    await invalidation.publish(db, APP_CHANGED_CHANNEL, app.client_id)
     await db.commit()
     await db.refresh(app)
+    _on_app_changed(app.client_id)
     return app
 
 
@@ -116,8 +186,10 @@ async def update_app_status(
     if not app:
         return None
     app.status = status
+    await invalidation.publish(db, APP_CHANGED_CHANNEL, app.client_id)
     await db.commit()
     await db.refresh(app)
+    _on_app_changed(app.client_id)
     return app
 
 
@@ -132,6 +204,9 @@ async def delete_app(db: AsyncSession, app_id: UUID) -> bool:
     app = await db.get(OAuthApp, app_id)
     if not app:
         return False
+    client_id = app.client_id
     await db.delete(app)
+    await invalidation.publish(db, APP_CHANGED_CHANNEL, client_id)
     await db.commit()
+    _on_app_changed(client_id)
     return True
@@ -7,13 +7,17 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import select, update
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models.access_token import AccessToken
 from app.models.authorization_code import AuthorizationCode
 from app.models.refresh_token import RefreshToken
+from app.services import revocation_service, token_writer
+
+# Built once; SQLAlchemy caches the compiled SQL on first use
+_AUTH_CODE_BY_CODE = select(AuthorizationCode).where(AuthorizationCode.code == bindparam("code"))
 
 
 def _generate_code() -> str:
@@ -59,16 +63,23 @@ async def exchange_authorization_code(
     client_id: str,
     redirect_uri: str,
     code_verifier: Optional[str] = None,
+    commit: bool = True,
 ) -> Optional[AuthorizationCode]:
-    result = await db.execute(
-        select(AuthorizationCode).where(AuthorizationCode.code == code)
-    )
+    """Validate and consume an authorization code.
+
+    With commit=False the code is only flushed as used; the caller commits it
+    together with the tokens it issues (see issue_authorization_code_tokens).
+    """
+    result = await db.execute(_AUTH_CODE_BY_CODE, {"code": code})
     record = result.scalar_one_or_none()
 
     if not record:
         return None
     if record.used:
         # M5: Auth code replay — revoke all tokens for this client+user (RFC 6749 S10.5)
+        # Queued rows first: one flushed after the UPDATE below would be missed
+        for jti in token_writer.revoke_pending_for(record.client_id, record.user_id):
+            revocation_service.mark_revoked(jti)
         await db.execute(
             update(AccessToken)
             .where(
@@ -108,5 +119,8 @@ async def exchange_authorization_code(
             return None
 
     record.used = True
-    await db.commit()
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
     return record
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Set
+from operator import attrgetter
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -23,12 +24,71 @@ DISCORD_CLAIM_KEYS = {
 # All other claims come from live Discord data — no DB fallback.
 CLAIM_RESOLVERS = {
     "sub": lambda u: str(u.id),
-    "email": lambda u: u.email,
+    "email": attrgetter("email"),
     "email_verified": lambda u: True if u.email else False,
     "date_joined": lambda u: u.created_at.isoformat() if u.created_at else None,
 }
 
 
+class _ClaimPlan:
+    """resolve_claims compiled for one (claim_names, discord_claim_names) pair."""
+
+    __slots__ = ("discord", "fallbacks", "model")
+
+    def __init__(self, claim_names, discord_claim_names):
+        # type: (Tuple[str, ...], FrozenSet[str]) -> None
+        discord = []  # type: List[Tuple[str, str]]
+        fallbacks = []  # type: List[Tuple[str, str, Optional[Callable[[Any], Any]]]]
+        model = []  # type: List[Tuple[str, Callable[[Any], Any]]]
+        for name in claim_names:
+            discord_key = DISCORD_CLAIM_KEYS.get(name) if name in discord_claim_names else None
+            resolver = CLAIM_RESOLVERS.get(name)
+            if discord_key is not None:
+                discord.append((name, discord_key))
+                fallbacks.append((name, discord_key, resolver))
+            elif resolver is not None:
+                model.append((name, resolver))
+        # (claim, discord data key) — plain subscripts beat itemgetter + zip here
+        self.discord = tuple(discord)
+        # Same claims with their model resolver, for missing/partial live data
+        self.fallbacks = tuple(fallbacks)
+        self.model = tuple(model)
+
+    def resolve(self, user, discord_data):
+        # type: (object, Optional[Dict]) -> Dict
+        result = {}
+        if self.discord:
+            try:
+                # Fast path: cache_member always fills every Discord key
+                for name, key in self.discord:
+                    result[name] = discord_data[key]
+            except (KeyError, TypeError):
+                for name, key, resolver in self.fallbacks:
+                    if discord_data is not None and key in discord_data:
+                        result[name] = discord_data[key]
+                    elif resolver is not None:
+                        result[name] = resolver(user)
+        for name, resolver in self.model:
+            result[name] = resolver(user)
+        return result
+
+
+# (claim_names, discord_claim_names) → compiled plan. A plain dict rather than
+# lru_cache: the lookup is on the userinfo hot path and the key space (distinct
+# scope grants × claim definition versions) is small.
+_plans = {}  # type: Dict[Tuple[Tuple[str, ...], FrozenSet[str]], _ClaimPlan]
+_PLANS_MAX = 1024
+_NO_CLAIMS = frozenset()  # type: FrozenSet[str]
+
+
+def _compile(key):
+    # type: (Tuple[Tuple[str, ...], FrozenSet[str]]) -> _ClaimPlan
+    if len(_plans) >= _PLANS_MAX:
+        _plans.clear()
+    plan = _plans[key] = _ClaimPlan(*key)
+    return plan
+
+
 def resolve_claims(
     user,  # type: object
     claim_names,  # type: List[str]
@@ -41,24 +101,15 @@ def resolve_claims(
     1. If the claim is Discord-sourced and live data is available, use it.
     2. If the claim has a built-in resolver in CLAIM_RESOLVERS, use it (DB columns).
     3. Otherwise, skip — no user data is stored in the DB beyond identity.
-    """
-    result = {}
-    _discord_claims = discord_claim_names or set()
-
-    for name in claim_names:
-        # Try live Discord data first for Discord-sourced claims
-        if name in _discord_claims and discord_data is not None:
-            discord_key = DISCORD_CLAIM_KEYS.get(name)
-            if discord_key and discord_key in discord_data:
-                result[name] = discord_data[discord_key]
-                continue
-
-        # Fall back to model resolver (only sub, email, email_verified, date_joined)
-        resolver = CLAIM_RESOLVERS.get(name)
-        if resolver is not None:
-            result[name] = resolver(user)
 
-    return result
+    The per-claim lookups are compiled once per claim set (see _ClaimPlan).
+    """
+    # frozenset() of a frozenset (what claim_service returns) is a no-op
+    key = (tuple(claim_names), frozenset(discord_claim_names) if discord_claim_names else _NO_CLAIMS)
+    plan = _plans.get(key)
+    if plan is None:
+        plan = _compile(key)
+    return plan.resolve(user, discord_data)
 
 
 async def get_available_claim_names(db: AsyncSession) -> List[str]:
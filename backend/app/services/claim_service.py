@@ -2,26 +2,51 @@ from __future__ import annotations
 
 import time
 import uuid
-from typing import Dict, List, Optional, Set
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.database import async_session, is_read_replica
 from app.models.claim_definition import ClaimDefinition
+from app.services import invalidation
 
 # In-memory cache
 _cache_data = None  # type: Optional[List[Dict]]
 _cache_time = 0.0
-_CACHE_TTL = 60.0  # seconds
+_CACHE_TTL = 60.0  # seconds, while the invalidation listener is not connected
+# Bumped on every invalidation; guards against caching a read that raced one
+_cache_version = 0
 
+CLAIMS_CHANGED_CHANNEL = "oauth_claims_changed"
 
-def _invalidate_cache():
-    # type: () -> None
-    global _cache_data, _cache_time
+# (claims list it was computed from, discord-sourced claim names)
+_discord_names = (None, frozenset())  # type: Tuple[Optional[List[Dict]], FrozenSet[str]]
+
+
+def _invalidate_cache(_payload=""):
+    # type: (str) -> None
+    global _cache_data, _cache_time, _cache_version
+    _cache_version += 1
     _cache_data = None
     _cache_time = 0.0
 
 
+invalidation.subscribe(CLAIMS_CHANGED_CHANNEL, _invalidate_cache)
+
+
+def get_cache_version():
+    # type: () -> int
+    return _cache_version
+
+
+def _cache_ttl():
+    # type: () -> float
+    # Long TTL only while this worker is actually receiving invalidations
+    return settings.definition_cache_ttl_seconds if invalidation.is_connected() else _CACHE_TTL
+
+
 def _claim_to_dict(claim):
     # type: (ClaimDefinition) -> Dict
     return {
@@ -39,8 +64,14 @@ async def get_all_claims(db, include_inactive=False):
     # type: (AsyncSession, bool) -> List[Dict]
     global _cache_data, _cache_time
 
-    if not include_inactive and _cache_data is not None and (time.time() - _cache_time) < _CACHE_TTL:
+    if not include_inactive and _cache_data is not None and (time.time() - _cache_time) < _cache_ttl():
         return _cache_data
+    if not include_inactive and is_read_replica(db):
+        # Cache fills read the primary (see scope_service.get_all_scopes)
+        async with async_session() as primary:
+            return await get_all_claims(primary)
+
+    version = _cache_version
 
     query = select(ClaimDefinition).order_by(ClaimDefinition.name)
     if not include_inactive:
@@ -49,7 +80,7 @@ async def get_all_claims(db, include_inactive=False):
     result = await db.execute(query)
     claims = [_claim_to_dict(c) for c in result.scalars().all()]
 
-    if not include_inactive:
+    if not include_inactive and version == _cache_version:
         _cache_data = claims
         _cache_time = time.time()
 
@@ -63,10 +94,15 @@ async def get_active_claim_names(db):
 
 
 async def get_discord_claim_names(db):
-    # type: (AsyncSession) -> Set[str]
-    """Return claim names where source='discord'. Uses existing 60s cache."""
+    # type: (AsyncSession) -> FrozenSet[str]
+    """Return claim names where source='discord'. Uses the claim cache."""
+    global _discord_names
     claims = await get_all_claims(db)
-    return {c["name"] for c in claims if c.get("source") == "discord"}
+    # Recomputed only when the cached list changes; the same frozenset object
+    # is returned meanwhile, so claim_resolver's plan lookup hashes it for free
+    if _discord_names[0] is not claims:
+        _discord_names = (claims, frozenset(c["name"] for c in claims if c.get("source") == "discord"))
+    return _discord_names[1]
 
 
 async def create_claim(db, name, label, description="", source="model"):
@@ -78,6 +114,7 @@ async def create_claim(db, name, label, description="", source="model"):
         source=source,
     )
     db.add(claim)
+    await invalidation.publish(db, CLAIMS_CHANGED_CHANNEL)
     await db.commit()
     await db.refresh(claim)
     _invalidate_cache()
@@ -94,6 +131,7 @@ async def update_claim(db, claim_id, **kwargs):
         if key in kwargs and kwargs[key] is not None:
             setattr(claim, key, kwargs[key])
 
+    await invalidation.publish(db, CLAIMS_CHANGED_CHANNEL)
     await db.commit()
     await db.refresh(claim)
     _invalidate_cache()
@@ -106,6 +144,7 @@ async def deactivate_claim(db, claim_id):
     if not claim:
         return None
     claim.is_active = False
+    await invalidation.publish(db, CLAIMS_CHANGED_CHANNEL)
     await db.commit()
     await db.refresh(claim)
     _invalidate_cache()
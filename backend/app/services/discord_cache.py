@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.cache import LRUTTLCache
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Storage for live Discord data (member claims, guild roles). "memory" is
+# per-process; "sqlite" (a WAL-mode, mmap'd file on tmpfs) and "redis" are
+# shared by every worker on the host, so N workers keep one warm cache.
+# Entries are (stored_at, value) and expire after discord_cache_hard_ttl_seconds;
+# callers apply the soft TTL themselves.
+
+Entry = Tuple[float, Any]
+
+
+def _dumps(stored_at: float, value: Any) -> bytes:
+    return json.dumps([stored_at, value], separators=(",", ":")).encode()
+
+
+def _loads(raw: bytes) -> Entry:
+    stored_at, value = json.loads(raw)
+    return stored_at, value
+
+
+class CacheBackend(abc.ABC):
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get_entry(self, key: str) -> Optional[Entry]:
+        entry = await self._get(key)
+        if entry is None or time.time() - entry[0] >= self.ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    async def contains(self, key: str) -> bool:
+        """True if key holds an unexpired entry; not counted as a hit or miss."""
+        entry = await self._get(key)
+        return entry is not None and time.time() - entry[0] < self.ttl
+
+    @abc.abstractmethod
+    async def _get(self, key: str) -> Optional[Entry]:
+        ...
+
+    @abc.abstractmethod
+    async def put(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def pop(self, key: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "hits": self.hits, "misses": self.misses}
+
+
+class MemoryBackend(CacheBackend):
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        super().__init__(maxsize, ttl)
+        self._lru = LRUTTLCache(maxsize=maxsize, ttl=ttl)  # type: LRUTTLCache[Any]
+
+    async def _get(self, key: str) -> Optional[Entry]:
+        return self._lru.get_entry(key)
+
+    async def put(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        self._lru.put(key, value, stored_at=stored_at)
+
+    async def pop(self, key: str) -> None:
+        self._lru.pop(key)
+
+    async def clear(self) -> None:
+        self._lru.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._lru.stats(), backend="MemoryBackend")
+
+
+class SQLiteBackend(CacheBackend):
+    """Host-local shared cache in a SQLite file (tmpfs by default).
+
+    Queries run on one dedicated thread per worker, so lock contention between
+    workers never blocks the event loop. SQLite errors (e.g. "database is
+    locked") are logged and treated as a miss / no-op.
+    """
+
+    _PRUNE_EVERY = 1000  # puts between expiry/size sweeps
+
+    def __init__(self, maxsize: int, ttl: float, path: str) -> None:
+        super().__init__(maxsize, ttl)
+        self.path = path
+        self.errors = 0
+        self._executor = None  # type: Optional[ThreadPoolExecutor]
+        self._conn = None  # type: Optional[sqlite3.Connection]
+        self._pid = None  # type: Optional[int]
+        self._puts = 0
+        self._size = 0  # row count as of the last sweep, for stats()
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # One thread and connection per worker process; never reuse either across fork
+        if self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="discord-cache")
+            self._conn, self._pid = None, os.getpid()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        except sqlite3.Error:
+            self.errors += 1
+            logger.warning("Discord cache SQLite call failed; treating as a miss", exc_info=True)
+            return None
+
+    def _db(self) -> sqlite3.Connection:
+        # Only ever called on the executor thread
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS discord_cache "
+                "(key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS discord_cache_stored_at ON discord_cache (stored_at)")
+            self._conn = conn
+            self._size = conn.execute("SELECT COUNT(*) FROM discord_cache").fetchone()[0]
+        return self._conn
+
+    def _get_sync(self, key: str) -> Optional[Entry]:
+        row = self._db().execute("SELECT value FROM discord_cache WHERE key = ?", (key,)).fetchone()
+        return _loads(row[0]) if row else None
+
+    def _put_sync(self, key: str, stored_at: float, raw: bytes) -> None:
+        db = self._db()
+        db.execute(
+            "INSERT OR REPLACE INTO discord_cache (key, stored_at, value) VALUES (?, ?, ?)",
+            (key, stored_at, raw),
+        )
+        self._puts += 1
+        if self._puts % self._PRUNE_EVERY == 0:
+            self._prune(db)
+
+    def _prune(self, db: sqlite3.Connection) -> None:
+        db.execute("DELETE FROM discord_cache WHERE stored_at < ?", (time.time() - self.ttl,))
+        db.execute(
+            "DELETE FROM discord_cache WHERE key IN ("
+            "SELECT key FROM discord_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        )
+        self._size = db.execute("SELECT COUNT(*) FROM discord_cache").fetchone()[0]
+
+    def _execute_sync(self, sql: str, params: Tuple = ()) -> None:
+        self._db().execute(sql, params)
+
+    async def _get(self, key: str) -> Optional[Entry]:
+        return await self._run(self._get_sync, key)
+
+    async def put(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        stored_at = time.time() if stored_at is None else stored_at
+        await self._run(self._put_sync, key, stored_at, _dumps(stored_at, value))
+
+    async def pop(self, key: str) -> None:
+        await self._run(self._execute_sync, "DELETE FROM discord_cache WHERE key = ?", (key,))
+
+    async def clear(self) -> None:
+        await self._run(self._execute_sync, "DELETE FROM discord_cache")
+        self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        # No query here: /metrics must not touch the file on every scrape
+        return dict(
+            super().stats(), size=self._size, maxsize=self.maxsize, path=self.path, errors=self.errors
+        )
+
+
+class RedisBackend(CacheBackend):
+    """Shared cache in Redis; keys expire server-side after the hard TTL.
+
+    Like SQLiteBackend, Redis errors are logged and treated as a miss / no-op,
+    so an outage degrades to direct Discord lookups instead of 500s.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, url: str, prefix: str) -> None:
+        super().__init__(maxsize, ttl)
+        try:
+            import redis.asyncio as redis_asyncio
+            from redis.exceptions import RedisError
+        except ImportError as exc:
+            raise RuntimeError(
+                "discord_cache_backend=redis requires the 'redis' package (requirements-redis.txt)"
+            ) from exc
+        self._redis = redis_asyncio.from_url(url)
+        self._prefix = prefix
+        self._error_types = (RedisError, OSError)
+        self.errors = 0
+
+    def _failed(self) -> None:
+        self.errors += 1
+        logger.warning("Discord cache Redis call failed; treating as a miss", exc_info=True)
+
+    async def _get(self, key: str) -> Optional[Entry]:
+        try:
+            raw = await self._redis.get(self._prefix + key)
+        except self._error_types:
+            self._failed()
+            return None
+        return _loads(raw) if raw is not None else None
+
+    async def put(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        stored_at = time.time() if stored_at is None else stored_at
+        try:
+            await self._redis.set(
+                self._prefix + key, _dumps(stored_at, value), px=int(self.ttl * 1000)
+            )
+        except self._error_types:
+            self._failed()
+
+    async def pop(self, key: str) -> None:
+        try:
+            await self._redis.delete(self._prefix + key)
+        except self._error_types:
+            self._failed()
+
+    async def clear(self) -> None:
+        try:
+            async for key in self._redis.scan_iter(match=self._prefix + "*"):
+                await self._redis.delete(key)
+        except self._error_types:
+            self._failed()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(super().stats(), errors=self.errors)
+
+
+def _default_sqlite_path() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "ns-auth-discord-cache.sqlite3")
+
+
+def create_backend() -> CacheBackend:
+    maxsize = settings.discord_member_cache_max
+    ttl = settings.discord_cache_hard_ttl_seconds
+    backend = settings.discord_cache_backend
+    if backend == "memory":
+        return MemoryBackend(maxsize, ttl)
+    if backend == "sqlite":
+        return SQLiteBackend(maxsize, ttl, settings.discord_cache_path or _default_sqlite_path())
+    if backend == "redis":
+        return RedisBackend(maxsize, ttl, settings.redis_url, settings.discord_cache_redis_prefix)
+    raise ValueError(f"Unknown discord_cache_backend: {backend}")
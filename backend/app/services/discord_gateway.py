@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import platform
+import random
+from typing import Any, Dict, Optional
+
+from app import metrics
+from app.config import settings
+from app.services import discord_service
+
+logger = logging.getLogger(__name__)
+
+# Optional Discord Gateway consumer that keeps the member/role cache hot by
+# applying GUILD_MEMBER_* and GUILD_ROLE_* events as they happen, instead of
+# waiting for TTL expiry. settings.discord_gateway_source selects the input:
+#   ""        — disabled
+#   "gateway" — live websocket connection using the bot token
+#   <path>    — replay a recorded JSONL file of Gateway payloads (dev/tests)
+
+GATEWAY_URL = "wss://gateway.discord.gg/?v=10&encoding=json"
+# GUILDS (role events, GUILD_CREATE) | GUILD_MEMBERS (privileged: member events)
+GATEWAY_INTENTS = (1 << 0) | (1 << 1)
+
+_OP_DISPATCH = 0
+_OP_HEARTBEAT = 1
+_OP_IDENTIFY = 2
+_OP_RECONNECT = 7
+_OP_INVALID_SESSION = 9
+_OP_HELLO = 10
+_OP_HEARTBEAT_ACK = 11
+
+_RECONNECT_DELAY = 5.0  # seconds
+
+_task = None  # type: Optional[asyncio.Task]
+_stats = {
+    "events": 0, "member_updates": 0, "member_removals": 0, "role_updates": 0,
+    "connects": 0, "errors": 0, "missed_acks": 0,
+}
+
+
+async def handle_event(event_type: str, data: Dict[str, Any]) -> None:
+    """Apply one Gateway dispatch event to the Discord cache."""
+    if str(data.get("guild_id", "")) != settings.discord_guild_id:
+        return
+    _stats["events"] += 1
+
+    if event_type in ("GUILD_MEMBER_ADD", "GUILD_MEMBER_UPDATE"):
+        user_id = (data.get("user") or {}).get("id")
+        # Refresh only members someone has looked up; caching the whole guild
+        # would push real users out of the LRU
+        if user_id and await discord_service.is_member_cached(user_id):
+            await discord_service.cache_member(user_id, data)
+            _stats["member_updates"] += 1
+
+    elif event_type == "GUILD_MEMBER_REMOVE":
+        user_id = (data.get("user") or {}).get("id")
+        if user_id:
+            await discord_service.invalidate_member_cache(user_id)
+            _stats["member_removals"] += 1
+
+    elif event_type == "GUILD_CREATE":
+        await discord_service.set_guild_roles({r["id"]: r["name"] for r in data.get("roles", [])})
+        _stats["role_updates"] += 1
+
+    elif event_type in ("GUILD_ROLE_CREATE", "GUILD_ROLE_UPDATE", "GUILD_ROLE_DELETE"):
+        cached = await discord_service.get_cached_guild_roles()
+        if cached is None:
+            # No role map to patch; the next lookup fetches the full list.
+            # Members may still embed the old name, so drop them on change.
+            if event_type != "GUILD_ROLE_CREATE":
+                await discord_service.clear_cache()
+            return
+        roles = dict(cached)
+        if event_type == "GUILD_ROLE_DELETE":
+            renamed = roles.pop(data.get("role_id"), None) is not None
+        else:
+            role = data.get("role") or {}
+            renamed = role.get("id") in roles and roles[role["id"]] != role.get("name")
+            roles[role["id"]] = role.get("name")
+        # Cached members embed role names; only a rename/delete invalidates them
+        await discord_service.set_guild_roles(roles, drop_members=renamed)
+        _stats["role_updates"] += 1
+
+
+async def _apply(event_type: str, data: Dict[str, Any]) -> None:
+    # One bad event must not tear down the session (and cost an IDENTIFY)
+    try:
+        await handle_event(event_type, data)
+    except Exception:
+        _stats["errors"] += 1
+        logger.exception("Failed to apply Discord Gateway event %s", event_type)
+
+
+async def replay_file(path: str) -> int:
+    """Apply every dispatch event in a recorded JSONL file. Returns the count."""
+    count = 0
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            payload = json.loads(line)
+            if payload.get("op", _OP_DISPATCH) == _OP_DISPATCH and payload.get("t"):
+                await _apply(payload["t"], payload.get("d") or {})
+                count += 1
+    return count
+
+
+async def _heartbeat(ws, interval: float, state: Dict[str, Any]) -> None:
+    # First beat is jittered per the Gateway docs
+    await asyncio.sleep(interval * random.random())
+    while True:
+        if not state["acked"]:
+            # Zombie connection: no ACK since the last beat. Closing ends the
+            # receive loop so _run reconnects.
+            _stats["missed_acks"] += 1
+            logger.warning("Discord Gateway heartbeat not acknowledged; reconnecting")
+            await ws.close(code=4000)
+            return
+        state["acked"] = False
+        await ws.send(json.dumps({"op": _OP_HEARTBEAT, "d": state["seq"]}))
+        await asyncio.sleep(interval)
+
+
+async def _run_session() -> None:
+    import websockets
+
+    async with websockets.connect(GATEWAY_URL, max_size=None) as ws:
+        hello = json.loads(await ws.recv())
+        if hello.get("op") != _OP_HELLO:
+            raise RuntimeError(f"Expected Gateway HELLO, got op {hello.get('op')}")
+        state = {"seq": None, "acked": True}  # type: Dict[str, Any]
+        heartbeat = asyncio.create_task(
+            _heartbeat(ws, hello["d"]["heartbeat_interval"] / 1000, state)
+        )
+        try:
+            await ws.send(json.dumps({
+                "op": _OP_IDENTIFY,
+                "d": {
+                    "token": settings.discord_bot_token,
+                    "intents": GATEWAY_INTENTS,
+                    "properties": {"os": platform.system().lower(), "browser": "ns-auth", "device": "ns-auth"},
+                },
+            }))
+            _stats["connects"] += 1
+            async for raw in ws:
+                payload = json.loads(raw)
+                op = payload.get("op")
+                if payload.get("s") is not None:
+                    state["seq"] = payload["s"]
+                if op == _OP_DISPATCH:
+                    await _apply(payload.get("t") or "", payload.get("d") or {})
+                elif op == _OP_HEARTBEAT_ACK:
+                    state["acked"] = True
+                elif op == _OP_HEARTBEAT:
+                    await ws.send(json.dumps({"op": _OP_HEARTBEAT, "d": state["seq"]}))
+                elif op in (_OP_RECONNECT, _OP_INVALID_SESSION):
+                    return
+        finally:
+            heartbeat.cancel()
+
+
+async def _run() -> None:
+    source = settings.discord_gateway_source
+    if source != "gateway":
+        count = await replay_file(source)
+        logger.info("Replayed %d Discord Gateway events from %s", count, source)
+        return
+
+    while True:
+        try:
+            await _run_session()
+            logger.info("Discord Gateway asked us to reconnect")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Discord Gateway connection failed; reconnecting")
+        # Events were missed while disconnected; TTLs still bound staleness
+        await asyncio.sleep(_RECONNECT_DELAY)
+
+
+def start() -> None:
+    global _task
+    if _task is None and settings.discord_gateway_source:
+        _task = asyncio.create_task(_run())
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+
+metrics.register("discord_gateway", lambda: dict(_stats))
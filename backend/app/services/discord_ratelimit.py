@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app import metrics
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Client-side scheduler for Discord's per-route rate limits. Requests are
+# grouped into buckets by (method, route template, major parameter); once
+# Discord reports the bucket hash (X-RateLimit-Bucket) routes sharing a hash
+# share state. When a bucket is exhausted, callers queue on its lock until
+# X-RateLimit-Reset-After elapses instead of running into a 429. 429s that
+# still happen are retried after retry_after (a global 429 pauses every
+# paced request).
+
+
+class _Bucket:
+    __slots__ = ("limit", "remaining", "reset_at", "window", "lock", "probe", "waiting", "throttled")
+
+    def __init__(self) -> None:
+        self.limit = None  # type: Optional[int]
+        self.remaining = None  # type: Optional[int]  # None = unknown
+        self.reset_at = 0.0  # monotonic
+        self.window = 0.0  # longest Reset-After seen ≈ window length
+        self.lock = asyncio.Lock()
+        # Set while no request is probing an unknown bucket for its limits
+        self.probe = asyncio.Event()
+        self.probe.set()
+        self.waiting = 0
+        self.throttled = 0
+
+    async def acquire(self) -> None:
+        self.waiting += 1
+        try:
+            # Holding the lock while sleeping queues later callers in order
+            async with self.lock:
+                # Until Discord reports the limits, send one request at a time
+                await self.probe.wait()
+                if self.remaining is None:
+                    self.probe.clear()
+                    return
+                if self.remaining <= 0:
+                    delay = self.reset_at - time.monotonic()
+                    if delay > 0:
+                        self.throttled += 1
+                        await asyncio.sleep(delay)
+                    # Assume a fresh window until a response reports the real reset
+                    self.remaining = self.limit
+                    self.reset_at = time.monotonic() + self.window
+                if self.remaining is not None:
+                    self.remaining -= 1
+        finally:
+            self.waiting -= 1
+
+    def release(self) -> None:
+        self.probe.set()
+
+    def update(self, headers: httpx.Headers) -> None:
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is None or reset_after is None:
+            return
+        reset_at = time.monotonic() + float(reset_after)
+        if self.remaining is not None and reset_at < self.reset_at - 0.05:
+            return  # late response from an earlier window
+        limit = headers.get("X-RateLimit-Limit")
+        if limit is not None:
+            self.limit = int(limit)
+        self.window = max(self.window, float(reset_after))
+        # acquire() already counts our own in-flight calls; the header only
+        # lowers that (other clients sharing the bucket)
+        self.remaining = int(remaining) if self.remaining is None else min(self.remaining, int(remaining))
+        self.reset_at = reset_at
+
+
+# "METHOD route" → Discord bucket hash, learned from X-RateLimit-Bucket
+_route_hashes = {}  # type: Dict[str, str]
+# "hash-or-route:major" → bucket state
+_buckets = {}  # type: Dict[str, _Bucket]
+_global_reset_at = 0.0  # monotonic
+_stats = {"requests": 0, "rate_limited": 0, "global_rate_limited": 0, "retries": 0}
+
+
+def _bucket_key(method: str, route: str, major: str) -> str:
+    route_key = f"{method} {route}"
+    return f"{_route_hashes.get(route_key, route_key)}:{major}"
+
+
+def _get_bucket(method: str, route: str, major: str) -> _Bucket:
+    key = _bucket_key(method, route, major)
+    bucket = _buckets.get(key)
+    if bucket is None:
+        bucket = _buckets[key] = _Bucket()
+    return bucket
+
+
+def _learn_hash(method: str, route: str, major: str, bucket: _Bucket, headers: httpx.Headers) -> None:
+    bucket_hash = headers.get("X-RateLimit-Bucket")
+    route_key = f"{method} {route}"
+    if bucket_hash and _route_hashes.get(route_key) != bucket_hash:
+        if _buckets.get(_bucket_key(method, route, major)) is bucket:
+            del _buckets[_bucket_key(method, route, major)]
+        _route_hashes[route_key] = bucket_hash
+        _buckets.setdefault(f"{bucket_hash}:{major}", bucket)
+
+
+def _retry_after(resp: httpx.Response) -> float:
+    try:
+        return float(resp.json()["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        return float(resp.headers.get("Retry-After", 1.0))
+
+
+def _is_global(resp: httpx.Response) -> bool:
+    if resp.headers.get("X-RateLimit-Global") == "true":
+        return True
+    try:
+        return bool(resp.json().get("global"))
+    except (ValueError, AttributeError):
+        return False
+
+
+async def request(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    route: str,
+    major: str = "",
+    paced: bool = True,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a Discord API request, pacing it against its rate-limit bucket.
+
+    route is the path template (e.g. "/guilds/{guild_id}/members/{user_id}")
+    and major the guild/channel ID Discord scopes the bucket to. paced=False
+    skips bucket tracking (for OAuth calls limited per user token) but still
+    retries 429s. Returns the last response, which may still be a 429 if the
+    retries or the advertised delay exceed the configured limits.
+    """
+    global _global_reset_at
+
+    bucket = _get_bucket(method, route, major) if paced else None
+    attempt = 0
+    while True:
+        if paced:
+            delay = _global_reset_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await bucket.acquire()
+
+        _stats["requests"] += 1
+        try:
+            resp = await client.request(method, url, **kwargs)
+            if bucket is not None:
+                bucket.update(resp.headers)
+                _learn_hash(method, route, major, bucket, resp.headers)
+        finally:
+            if bucket is not None:
+                bucket.release()
+        if resp.status_code != 429:
+            return resp
+
+        _stats["rate_limited"] += 1
+        retry_after = _retry_after(resp)
+        if attempt >= settings.discord_max_retries or retry_after > settings.discord_max_retry_after_seconds:
+            logger.warning("Discord rate limited %s %s; giving up (retry_after=%.1fs)", method, route, retry_after)
+            return resp
+        attempt += 1
+        _stats["retries"] += 1
+
+        if paced and _is_global(resp):
+            _stats["global_rate_limited"] += 1
+            _global_reset_at = max(_global_reset_at, time.monotonic() + retry_after)
+        elif bucket is not None:
+            bucket.remaining = 0
+            bucket.reset_at = max(bucket.reset_at, time.monotonic() + retry_after)
+        else:
+            await asyncio.sleep(retry_after)
+
+
+def get_stats() -> dict:
+    now = time.monotonic()
+    buckets = {}
+    for key, bucket in _buckets.items():
+        reset_in = max(0.0, bucket.reset_at - now)
+        remaining = bucket.remaining if reset_in > 0 else bucket.limit
+        buckets[key] = {
+            "limit": bucket.limit,
+            "remaining": remaining,
+            "reset_in": round(reset_in, 3),
+            "saturation": (
+                round(1 - remaining / bucket.limit, 3)
+                if bucket.limit and remaining is not None else None
+            ),
+            "waiting": bucket.waiting,
+            "throttled": bucket.throttled,
+        }
+    return dict(_stats, global_reset_in=round(max(0.0, _global_reset_at - now), 3), buckets=buckets)
+
+
+metrics.register("discord_ratelimit", get_stats)
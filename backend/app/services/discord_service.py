@@ -1,23 +1,114 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, TypeVar
 from urllib.parse import urlencode
 
 import httpx
 
+from app import metrics
 from app.config import settings
+from app.services import discord_cache, discord_ratelimit
 
 logger = logging.getLogger(__name__)
 
 DISCORD_API = "https://discord.com/api/v10"
 DISCORD_OAUTH_SCOPES = "identify email guilds.members.read"
 
-# L6: Bounded TTL cache (max 1000 entries, evict oldest on overflow)
-_MEMBER_CACHE_MAX = 1000
-_member_cache = {}  # type: Dict[str, Tuple[float, Dict[str, Any]]]
-_guild_roles_cache = None  # type: Optional[Tuple[float, Dict[str, str]]]
+# L6: Bounded cache for live member data and guild roles, in-process or
+# shared across workers (see discord_cache). Member entries are fresh for
+# discord_cache_ttl_seconds, then served stale while a background refresh
+# runs, until discord_cache_hard_ttl_seconds drops them.
+_cache = discord_cache.create_backend()
+_GUILD_ROLES_KEY = "guild_roles"
+_MEMBER_ROUTE = "/guilds/{guild_id}/members/{user_id}"
+
+# In-flight Discord fetches by key, so concurrent cache misses share one call
+_inflight = {}  # type: Dict[str, asyncio.Task]
+# Strong refs to fire-and-forget refresh tasks (asyncio only keeps weak ones)
+_background = set()  # type: Set[asyncio.Task]
+
+T = TypeVar("T")
+
+# Application-lifetime HTTP client (keep-alive + HTTP/2), opened in main.lifespan
+_client = None  # type: Optional[httpx.AsyncClient]
+
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=settings.discord_http2,
+        timeout=settings.discord_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=settings.discord_max_connections,
+            max_keepalive_connections=settings.discord_max_keepalive_connections,
+            keepalive_expiry=settings.discord_keepalive_expiry_seconds,
+        ),
+    )
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        # Created lazily for callers outside the app lifespan (scripts)
+        _client = _new_client()
+    return _client
+
+
+async def start_client() -> None:
+    _get_client()
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _request(
+    method: str,
+    route: str,
+    path_params: Optional[Dict[str, str]] = None,
+    *,
+    bot: bool = True,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Call the Discord API through the rate-limit scheduler.
+
+    route is the path template; {guild_id} defaults to the configured guild.
+    Bot calls are paced per bucket; user-token calls (bot=False) only retry
+    429s, since their limits are per user.
+    """
+    params = {"guild_id": settings.discord_guild_id, **(path_params or {})}
+    if bot:
+        kwargs["headers"] = {"Authorization": f"Bot {settings.discord_bot_token}", **kwargs.get("headers", {})}
+    return await discord_ratelimit.request(
+        _get_client(),
+        method,
+        DISCORD_API + route.format(**params),
+        route=route,
+        major=params["guild_id"] if "{guild_id}" in route else "",
+        paced=bot,
+        **kwargs,
+    )
+
+
+async def _single_flight(key: str, fetch: Callable[[], Awaitable[T]]) -> T:
+    """Run fetch() at most once per key at a time; concurrent callers await it."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        _inflight[key] = task
+
+        def _done(finished: asyncio.Task) -> None:
+            if _inflight.get(key) is finished:
+                del _inflight[key]
+
+        task.add_done_callback(_done)
+    # shield: a cancelled caller must not cancel the fetch others are awaiting
+    return await asyncio.shield(task)
 
 
 def get_authorize_url(state: str) -> str:
@@ -35,82 +126,81 @@ def get_authorize_url(state: str) -> str:
 
 async def exchange_code(code: str) -> Optional[Dict[str, Any]]:
     """Exchange an authorization code for Discord tokens."""
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{DISCORD_API}/oauth2/token",
-            data={
-                "client_id": settings.discord_client_id,
-                "client_secret": settings.discord_client_secret,
-                "grant_type": "authorization_code",
-                "code": code,
-                "redirect_uri": settings.discord_redirect_uri,
-            },
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
-        if resp.status_code != 200:
-            return None
-        return resp.json()
+    resp = await _request(
+        "POST",
+        "/oauth2/token",
+        bot=False,
+        data={
+            "client_id": settings.discord_client_id,
+            "client_secret": settings.discord_client_secret,
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": settings.discord_redirect_uri,
+        },
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    if resp.status_code != 200:
+        return None
+    return resp.json()
 
 
 async def get_user(access_token: str) -> Optional[Dict[str, Any]]:
     """Fetch the authenticated Discord user's profile."""
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{DISCORD_API}/users/@me",
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
-        if resp.status_code != 200:
-            return None
-        return resp.json()
+    resp = await _request(
+        "GET", "/users/@me", bot=False, headers={"Authorization": f"Bearer {access_token}"}
+    )
+    if resp.status_code != 200:
+        return None
+    return resp.json()
+
+
+async def get_guild_member(user_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch a user's NS guild member object (uses bot token); None if not a member."""
+    resp = await _request("GET", _MEMBER_ROUTE, {"user_id": user_id})
+    if resp.status_code != 200:
+        return None
+    return resp.json()
 
 
 async def check_guild_membership(user_id: str) -> bool:
     """Check if a user is a member of the NS Discord guild (uses bot token)."""
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{DISCORD_API}/guilds/{settings.discord_guild_id}/members/{user_id}",
-            headers={"Authorization": f"Bot {settings.discord_bot_token}"},
-        )
-        return resp.status_code == 200
+    return await get_guild_member(user_id) is not None
+
+
+def _member_key(discord_id: str) -> str:
+    return f"member:{discord_id}"
 
 
 async def get_guild_roles() -> Dict[str, str]:
     """Fetch guild role ID→name mapping via bot token (cached with TTL)."""
-    global _guild_roles_cache
-
-    now = time.time()
-    if _guild_roles_cache is not None:
-        cached_at, cached_data = _guild_roles_cache
-        if (now - cached_at) < settings.discord_cache_ttl_seconds:
+    cached = await _cache.get_entry(_GUILD_ROLES_KEY)
+    if cached is not None:
+        cached_at, cached_data = cached
+        if (time.time() - cached_at) < settings.discord_cache_ttl_seconds:
             return cached_data
 
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        resp = await client.get(
-            f"{DISCORD_API}/guilds/{settings.discord_guild_id}/roles",
-            headers={"Authorization": f"Bot {settings.discord_bot_token}"},
-        )
-        if resp.status_code != 200:
-            # Return stale cache if available, else empty
-            if _guild_roles_cache is not None:
-                return _guild_roles_cache[1]
-            return {}
-        roles = resp.json()
-        result = {r["id"]: r["name"] for r in roles}
-        _guild_roles_cache = (now, result)
-        return result
+    return await _single_flight("guild_roles", _fetch_guild_roles)
+
+
+async def _fetch_guild_roles() -> Dict[str, str]:
+    now = time.time()
+    resp = await _request("GET", "/guilds/{guild_id}/roles")
+    if resp.status_code != 200:
+        # Return stale cache if available, else empty
+        stale = await _cache.get_entry(_GUILD_ROLES_KEY)
+        return stale[1] if stale is not None else {}
+    roles = resp.json()
+    result = {r["id"]: r["name"] for r in roles}
+    await _cache.put(_GUILD_ROLES_KEY, result, stored_at=now)
+    return result
 
 
 async def get_member_roles(user_id: str) -> List[Dict[str, str]]:
     """Get a guild member's roles as objects with id and name."""
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{DISCORD_API}/guilds/{settings.discord_guild_id}/members/{user_id}",
-            headers={"Authorization": f"Bot {settings.discord_bot_token}"},
-        )
-        if resp.status_code != 200:
-            return []
-        member = resp.json()
-        role_ids = member.get("roles", [])
+    member = await get_guild_member(user_id)
+    if member is None:
+        return []
+    role_ids = member.get("roles", [])
 
     # Resolve role names from guild roles
     guild_roles = await get_guild_roles()
@@ -169,31 +259,59 @@ async def get_live_member_data(discord_id: str) -> Optional[Dict[str, Any]]:
     One API call serves all Discord-sourced claims (roles, name, picture,
     username, joined_at, boosting, banner, accent_color, badges).
     """
-    now = time.time()
-    cached = _member_cache.get(discord_id)
+    cached = await _cache.get_entry(_member_key(discord_id))
     if cached is not None:
         cached_at, cached_data = cached
-        if (now - cached_at) < settings.discord_cache_ttl_seconds:
-            return cached_data
+        if (time.time() - cached_at) >= settings.discord_cache_ttl_seconds:
+            _refresh_member_in_background(discord_id)
+        return cached_data
 
     if not settings.discord_bot_token or not settings.discord_guild_id:
         return None
 
+    return await _single_flight(f"member:{discord_id}", lambda: _fetch_member_data(discord_id))
+
+
+def _refresh_member_in_background(discord_id: str) -> None:
+    """Stale-while-revalidate: refresh a soft-expired entry off the request path."""
+    key = f"member:{discord_id}"
+    if key in _inflight or not settings.discord_bot_token or not settings.discord_guild_id:
+        return
+    task = asyncio.ensure_future(_single_flight(key, lambda: _fetch_member_data(discord_id)))
+    _background.add(task)
+    task.add_done_callback(_background_done)
+
+
+def _background_done(task: asyncio.Task) -> None:
+    _background.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background Discord refresh failed: %r", task.exception())
+
+
+async def _fetch_member_data(discord_id: str) -> Optional[Dict[str, Any]]:
+    now = time.time()
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(
-                f"{DISCORD_API}/guilds/{settings.discord_guild_id}/members/{discord_id}",
-                headers={"Authorization": f"Bot {settings.discord_bot_token}"},
-            )
-            if resp.status_code != 200:
-                logger.warning("Discord member fetch failed for %s: %s", discord_id, resp.status_code)
-                return None
-
-            member = resp.json()
+        resp = await _request("GET", _MEMBER_ROUTE, {"user_id": discord_id})
+        if resp.status_code == 404:
+            # Left the guild — don't keep serving their stale entry
+            await _cache.pop(_member_key(discord_id))
+            return None
+        if resp.status_code != 200:
+            logger.warning("Discord member fetch failed for %s: %s", discord_id, resp.status_code)
+            return None
+
+        member = resp.json()
     except Exception:
         logger.exception("Discord API error fetching member %s", discord_id)
         return None
 
+    return await cache_member(discord_id, member, fetched_at=now)
+
+
+async def cache_member(
+    discord_id: str, member: Dict[str, Any], fetched_at: Optional[float] = None
+) -> Dict[str, Any]:
+    """Build claim data from a Discord guild member object and cache it."""
     user_obj = member.get("user") or {}
 
     # Resolve role names
@@ -228,14 +346,38 @@ async def get_live_member_data(discord_id: str) -> Optional[Dict[str, Any]]:
         "accent_color": "#{:06x}".format(user_obj["accent_color"]) if user_obj.get("accent_color") else None,
         "public_badges": _parse_public_flags(user_obj.get("public_flags")),
     }
-    # L6: Evict oldest entries if cache is full
-    if len(_member_cache) >= _MEMBER_CACHE_MAX:
-        oldest_key = min(_member_cache, key=lambda k: _member_cache[k][0])
-        del _member_cache[oldest_key]
-    _member_cache[discord_id] = (now, result)
+    await _cache.put(_member_key(discord_id), result, stored_at=fetched_at)
     return result
 
 
-def invalidate_member_cache(discord_id: str) -> None:
+async def is_member_cached(discord_id: str) -> bool:
+    return await _cache.contains(_member_key(discord_id))
+
+
+async def invalidate_member_cache(discord_id: str) -> None:
     """Remove a user's cached member data (call on login to force fresh data)."""
-    _member_cache.pop(discord_id, None)
+    await _cache.pop(_member_key(discord_id))
+
+
+async def clear_cache() -> None:
+    """Drop all cached Discord member and role data."""
+    await _cache.clear()
+
+
+async def set_guild_roles(roles: Dict[str, str], drop_members: bool = False) -> None:
+    """Replace the cached role ID→name map (e.g. from Gateway role events).
+
+    Member entries embed resolved role names, so pass drop_members=True when
+    a role was renamed or deleted.
+    """
+    if drop_members:
+        await clear_cache()
+    await _cache.put(_GUILD_ROLES_KEY, roles)
+
+
+async def get_cached_guild_roles() -> Optional[Dict[str, str]]:
+    cached = await _cache.get_entry(_GUILD_ROLES_KEY)
+    return cached[1] if cached is not None else None
+
+
+metrics.register("discord_cache", _cache.stats)
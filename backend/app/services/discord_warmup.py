@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Set
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.user import User
+from app.services import discord_service
+
+logger = logging.getLogger(__name__)
+
+# Bulk-fills the member cache after a deploy so the first logins/userinfo
+# calls don't each miss and hit Discord. Pages through the guild member list
+# (needs the GUILD_MEMBERS privileged intent on the bot) and caches every
+# member that has a row in users.
+
+_PAGE_SIZE = 1000  # Discord's maximum for List Guild Members
+
+_task = None  # type: Optional[asyncio.Task]
+
+
+async def _load_discord_ids() -> Set[str]:
+    from app.database import async_session
+
+    async with async_session() as db:
+        result = await db.execute(select(User.discord_id).where(User.discord_id.isnot(None)))
+        return {row[0] for row in result}
+
+
+async def _get_page(after: str) -> list:
+    # Paced and 429-retried by the scheduler; a 429 that outlives the retries
+    # raises here and ends the (best-effort) warm-up
+    resp = await discord_service._request(
+        "GET", "/guilds/{guild_id}/members", params={"limit": _PAGE_SIZE, "after": after}
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def warm_member_cache() -> Dict[str, int]:
+    """Cache live member data for every user with a discord_id.
+
+    Returns counts: users, cached, scanned (guild members seen) and pages.
+    """
+    wanted = await _load_discord_ids()
+    stats = {"users": len(wanted), "cached": 0, "scanned": 0, "pages": 0}
+    if not wanted:
+        return stats
+
+    started = time.monotonic()
+    await discord_service.get_guild_roles()
+    after = "0"
+    while wanted:
+        fetched_at = time.time()
+        page = await _get_page(after)
+        stats["pages"] += 1
+        stats["scanned"] += len(page)
+        for member in page:
+            discord_id = member["user"]["id"]
+            if discord_id in wanted:
+                await discord_service.cache_member(discord_id, member, fetched_at=fetched_at)
+                wanted.discard(discord_id)
+                stats["cached"] += 1
+        logger.info(
+            "Discord warm-up: page %d, %d members scanned, %d/%d users cached",
+            stats["pages"], stats["scanned"], stats["cached"], stats["users"],
+        )
+        if len(page) < _PAGE_SIZE:
+            break
+        after = page[-1]["user"]["id"]
+
+    logger.info(
+        "Discord warm-up finished in %.1fs: %d/%d users cached (%d not in guild)",
+        time.monotonic() - started, stats["cached"], stats["users"], len(wanted),
+    )
+    return stats
+
+
+async def _run() -> None:
+    try:
+        await warm_member_cache()
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        # Warm-up is best effort; requests fall back to per-user fetches
+        logger.exception("Discord warm-up failed")
+
+
+def start() -> None:
+    global _task
+    if _task is None and settings.discord_bot_token and settings.discord_guild_id:
+        _task = asyncio.create_task(_run())
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
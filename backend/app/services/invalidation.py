@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cross-worker cache invalidation over Postgres LISTEN/NOTIFY. Writers publish
+# on a channel inside their transaction (delivered on commit); every worker's
+# listener calls the handlers subscribed to that channel with the payload.
+# An empty payload means "drop everything" — sent to all handlers whenever the
+# listener (re)connects, since notifications may have been missed meanwhile.
+
+_handlers = {}  # type: Dict[str, List[Callable[[str], None]]]
+_listener_task = None  # type: Optional[asyncio.Task]
+# True only while the LISTEN connection is up; caches may rely on
+# notifications (long TTLs) only then
+_connected = False
+_RECONNECT_DELAY = 5.0  # seconds
+
+
+def subscribe(channel: str, handler: Callable[[str], None]) -> None:
+    _handlers.setdefault(channel, []).append(handler)
+
+
+async def publish(db: AsyncSession, channel: str, payload: str = "") -> None:
+    """Queue a notification on the current transaction; sent when it commits."""
+    await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+def is_connected() -> bool:
+    return _connected
+
+
+def _dispatch(channel: str, payload: str) -> None:
+    for handler in _handlers.get(channel, []):
+        try:
+            handler(payload)
+        except Exception:
+            logger.exception("Invalidation handler failed for %s", channel)
+
+
+def _listen_dsn() -> str:
+    # asyncpg wants a plain postgresql:// DSN, not the SQLAlchemy driver URL
+    url = make_url(settings.database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+async def _listen_loop() -> None:
+    global _connected
+    import asyncpg
+
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(_listen_dsn())
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: closed.set())
+            for channel in _handlers:
+                await conn.add_listener(
+                    channel, lambda _conn, _pid, ch, payload: _dispatch(ch, payload)
+                )
+            _connected = True
+            for channel in _handlers:
+                _dispatch(channel, "")
+            await closed.wait()
+            logger.warning("Invalidation listener connection closed; reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Invalidation listener failed; reconnecting")
+        finally:
+            _connected = False
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(_RECONNECT_DELAY)
+
+
+def start_listener() -> None:
+    global _listener_task
+    if _listener_task is None:
+        _listener_task = asyncio.create_task(_listen_loop())
+
+
+async def stop_listener() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.access_token import AccessToken
+
+logger = logging.getLogger(__name__)
+
+
+# Revoked, not-yet-expired access token jtis. Swapped wholesale on each sync.
+_revoked = set()  # type: Set[str]
+# Revocations made by this worker since the last sync, so a snapshot that was
+# read before their commit doesn't drop them.
+_local_marks = {}  # type: Dict[str, float]
+_last_sync = 0.0
+_sync_task = None  # type: Optional[asyncio.Task]
+
+
+def is_revoked(jti: str) -> bool:
+    return jti in _revoked
+
+
+def mark_revoked(jti: str) -> None:
+    """Record a revocation made by this worker without waiting for the next sync."""
+    _local_marks[jti] = time.time()
+    _revoked.add(jti)
+
+
+def is_ready() -> bool:
+    """True if the revoked set was synced recently enough to trust."""
+    return (time.time() - _last_sync) < settings.revocation_sync_interval_seconds * 3
+
+
+async def sync(db: AsyncSession) -> int:
+    """Reload revoked, unexpired jtis from the DB and swap in a fresh set."""
+    global _revoked, _last_sync
+
+    started = time.time()
+    result = await db.execute(
+        select(AccessToken.jti).where(
+            AccessToken.revoked == True,  # noqa: E712
+            AccessToken.expires_at > datetime.now(timezone.utc),
+        )
+    )
+    revoked = set(result.scalars().all())
+
+    # Keep local marks that may have committed after the snapshot was read
+    cutoff = started - settings.revocation_sync_interval_seconds
+    for jti, marked_at in list(_local_marks.items()):
+        if marked_at < cutoff:
+            del _local_marks[jti]
+        else:
+            revoked.add(jti)
+
+    _revoked = revoked
+    _last_sync = time.time()
+    return len(revoked)
+
+
+async def _sync_loop() -> None:
+    from app.database import async_session
+
+    while True:
+        try:
+            async with async_session() as db:
+                await sync(db)
+        except Exception:
+            logger.exception("Revoked-jti sync failed")
+        await asyncio.sleep(settings.revocation_sync_interval_seconds)
+
+
+def start_sync() -> None:
+    global _sync_task
+    if _sync_task is None:
+        _sync_task = asyncio.create_task(_sync_loop())
+
+
+async def stop_sync() -> None:
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
@@ -3,25 +3,112 @@ from __future__ import annotations
 import time
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Set
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.database import async_session, is_read_replica
 from app.models.scope_definition import ScopeDefinition
+from app.services import invalidation
 
 # In-memory cache
 _cache_data = None  # type: Optional[List[Dict]]
+_cache_plan = None  # type: Optional[_ScopePlan]
 _cache_time = 0.0
-_CACHE_TTL = 60.0  # seconds
-
-
-def _invalidate_cache() -> None:
-    global _cache_data, _cache_time
+_CACHE_TTL = 60.0  # seconds, while the invalidation listener is not connected
+# Bumped on every invalidation (local or from another worker) and reload;
+# also guards against caching a DB read that raced with an invalidation
+_cache_version = 0
+
+SCOPES_CHANGED_CHANNEL = "oauth_scopes_changed"
+
+
+class _ScopePlan:
+    """Active scopes compiled for claim resolution; rebuilt with the cache.
+
+    Results are memoized per (requested scopes, user role names), so repeat
+    userinfo / ID token resolutions are a dict hit.
+    """
+
+    _MEMO_MAX = 4096
+
+    def __init__(self, scopes: List[Dict]) -> None:
+        # (name, required role names or None, claims) in sort order
+        self.entries = tuple(
+            (s["name"], frozenset(s["required_roles"]) or None, tuple(s["claims"]))
+            for s in scopes
+        )  # type: Tuple[Tuple[str, Optional[FrozenSet[str]], Tuple[str, ...]], ...]
+        self.by_name = {s["name"]: s for s in scopes}  # type: Dict[str, Dict]
+        self.valid_names = frozenset(self.by_name)
+        self._memo = {}  # type: Dict[Tuple[FrozenSet[str], FrozenSet[str]], Tuple[Tuple[str, ...], Tuple[str, ...]]]
+
+    def resolve(
+        self, scope_names: Iterable[str], role_names: FrozenSet[str]
+    ) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Returns (claim names, qualified scope names) for a grant."""
+        key = (frozenset(scope_names), role_names)
+        result = self._memo.get(key)
+        if result is not None:
+            return result
+
+        requested = key[0]
+        qualified = []  # type: List[str]
+        # dict as an insertion-ordered set: first scope to grant a claim wins
+        claims = {}  # type: Dict[str, None]
+        for name, required, scope_claims in self.entries:
+            if name not in requested:
+                continue
+            # Role gating: skip if user doesn't have any required role
+            if required is not None and required.isdisjoint(role_names):
+                continue
+            qualified.append(name)
+            claims.update(dict.fromkeys(scope_claims))
+
+        result = (tuple(claims), tuple(qualified))
+        if len(self._memo) >= self._MEMO_MAX:
+            self._memo.clear()
+        self._memo[key] = result
+        return result
+
+
+def _invalidate_cache(_payload: str = "") -> None:
+    global _cache_data, _cache_plan, _cache_time, _cache_version
+    _cache_version += 1
     _cache_data = None
+    _cache_plan = None
     _cache_time = 0.0
 
 
+invalidation.subscribe(SCOPES_CHANGED_CHANNEL, _invalidate_cache)
+
+
+def get_cache_version() -> int:
+    """Changes whenever the active scope set may have changed."""
+    return _cache_version
+
+
+def _cache_ttl() -> float:
+    # Long TTL only while this worker is actually receiving invalidations
+    return settings.definition_cache_ttl_seconds if invalidation.is_connected() else _CACHE_TTL
+
+
+async def publish_change(db: AsyncSession) -> None:
+    """Tell every worker to drop its scope cache once db's transaction commits."""
+    await invalidation.publish(db, SCOPES_CHANGED_CHANNEL)
+
+
+def _role_names(user_roles: Optional[List]) -> FrozenSet[str]:
+    # user_roles can be a list of dicts (Discord role objects) or strings
+    if not user_roles:
+        return frozenset()
+    return frozenset(
+        role.get("name", "") if isinstance(role, dict) else str(role)
+        for role in user_roles
+    )
+
+
 def _scope_to_dict(scope: ScopeDefinition) -> Dict:
     return {
         "id": str(scope.id),
@@ -38,10 +125,17 @@ def _scope_to_dict(scope: ScopeDefinition) -> Dict:
 
 async def get_all_scopes(db: AsyncSession, include_inactive: bool = False) -> List[Dict]:
     """Returns all scopes (cached for active-only queries)."""
-    global _cache_data, _cache_time
+    global _cache_data, _cache_plan, _cache_time, _cache_version
 
-    if not include_inactive and _cache_data is not None and (time.time() - _cache_time) < _CACHE_TTL:
+    if not include_inactive and _cache_data is not None and (time.time() - _cache_time) < _cache_ttl():
         return _cache_data
+    if not include_inactive and is_read_replica(db):
+        # Cache fills read the primary, so a lagging replica can't re-cache
+        # rows an invalidation just dropped
+        async with async_session() as primary:
+            return await get_all_scopes(primary)
+
+    version = _cache_version
 
     query = select(ScopeDefinition).order_by(ScopeDefinition.sort_order)
     if not include_inactive:
@@ -50,9 +144,11 @@ async def get_all_scopes(db: AsyncSession, include_inactive: bool = False) -> Li
     result = await db.execute(query)
     scopes = [_scope_to_dict(s) for s in result.scalars().all()]
 
-    if not include_inactive:
+    if not include_inactive and version == _cache_version:
         _cache_data = scopes
+        _cache_plan = _ScopePlan(scopes)
         _cache_time = time.time()
+        _cache_version += 1
 
     return scopes
 
@@ -66,10 +162,19 @@ async def get_scope_by_name(db: AsyncSession, name: str) -> Optional[Dict]:
     return _scope_to_dict(scope) if scope else None
 
 
+async def _get_plan(db: AsyncSession) -> _ScopePlan:
+    scopes = await get_all_scopes(db)
+    plan = _cache_plan
+    if plan is None or _cache_data is not scopes:
+        # Cache was invalidated while we were loading; compile this result
+        plan = _ScopePlan(scopes)
+    return plan
+
+
 async def get_valid_scope_names(db: AsyncSession) -> Set[str]:
     """Set of active scope names (for validation)."""
-    scopes = await get_all_scopes(db)
-    return {s["name"] for s in scopes}
+    plan = await _get_plan(db)
+    return set(plan.valid_names)
 
 
 async def get_claims_for_scopes(
@@ -78,34 +183,9 @@ async def get_claims_for_scopes(
     user_roles: Optional[List] = None,
 ) -> List[str]:
     """Union of all claim names for given scopes, filtered by role requirements."""
-    scopes = await get_all_scopes(db)
-    claims = []  # type: List[str]
-    seen = set()  # type: Set[str]
-
-    # Extract role names from user_roles (can be list of dicts or list of strings)
-    user_role_names = set()  # type: Set[str]
-    if user_roles:
-        for role in user_roles:
-            if isinstance(role, dict):
-                user_role_names.add(role.get("name", ""))
-            else:
-                user_role_names.add(str(role))
-
-    for scope in scopes:
-        if scope["name"] not in scope_names:
-            continue
-
-        # Role gating: skip if user doesn't have required roles
-        required = scope.get("required_roles") or []
-        if required and not user_role_names.intersection(set(required)):
-            continue
-
-        for claim in scope.get("claims", []):
-            if claim not in seen:
-                claims.append(claim)
-                seen.add(claim)
-
-    return claims
+    plan = await _get_plan(db)
+    claims, _ = plan.resolve(scope_names, _role_names(user_roles))
+    return list(claims)
 
 
 async def filter_scopes_by_roles(
@@ -114,25 +194,9 @@ async def filter_scopes_by_roles(
     user_roles: Optional[List] = None,
 ) -> List[str]:
     """Returns only scopes the user qualifies for based on Discord roles."""
-    scopes = await get_all_scopes(db)
-
-    user_role_names = set()  # type: Set[str]
-    if user_roles:
-        for role in user_roles:
-            if isinstance(role, dict):
-                user_role_names.add(role.get("name", ""))
-            else:
-                user_role_names.add(str(role))
-
-    qualified = []  # type: List[str]
-    for scope in scopes:
-        if scope["name"] not in scope_names:
-            continue
-        required = scope.get("required_roles") or []
-        if not required or user_role_names.intersection(set(required)):
-            qualified.append(scope["name"])
-
-    return qualified
+    plan = await _get_plan(db)
+    _, qualified = plan.resolve(scope_names, _role_names(user_roles))
+    return list(qualified)
 
 
 async def create_scope(
@@ -156,6 +220,7 @@ async def create_scope(
         is_system=is_system,
     )
     db.add(scope)
+    await publish_change(db)
     await db.commit()
     await db.refresh(scope)
     _invalidate_cache()
@@ -193,6 +258,7 @@ async def update_scope(
     if is_active is not None:
         scope.is_active = is_active
 
+    await publish_change(db)
     await db.commit()
     await db.refresh(scope)
     _invalidate_cache()
@@ -207,6 +273,7 @@ async def deactivate_scope(db: AsyncSession, scope_id: uuid.UUID) -> Optional[Di
     if scope.is_system:
         return None  # Can't deactivate system scopes
     scope.is_active = False
+    await publish_change(db)
     await db.commit()
     await db.refresh(scope)
     _invalidate_cache()
@@ -1,38 +1,70 @@
 from __future__ import annotations
 
 import secrets
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 
-from jose import jwt
-from sqlalchemy import select, update
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.database import async_session, is_read_replica
 from app.models.access_token import AccessToken
-from app.models.oauth_app import OAuthApp
 from app.models.refresh_token import RefreshToken
-from app.security.hashing import hash_token, verify_client_secret
-from app.security.keys import get_kid, get_private_key
-from app.services import claim_service, discord_service, scope_service
+from app.security import credential_cache
+from app.security.hashing import hash_token, verify_client_secret_async
+from app.security.keys import sign_jwt, verify_jwt
+from app.services import claim_service, discord_service, revocation_service, scope_service, token_writer, user_service
+from app.services.app_registry import AppSnapshot
 from app.services.claim_resolver import resolve_claims
 
+# Hot lookups, built once. SQLAlchemy caches their compiled SQL on first use;
+# building them per call would redo select() construction every request.
+_INTROSPECT_COLUMNS = ("scopes", "client_id", "user_id", "revoked", "expires_at", "created_at", "jti")
+# Column-only: introspection never needs an identity-mapped AccessToken
+_INTROSPECT_BY_HASH = select(
+    *(getattr(AccessToken, name) for name in _INTROSPECT_COLUMNS)
+).where(AccessToken.token_hash == bindparam("token_hash"))
+_ACCESS_TOKEN_BY_HASH = select(AccessToken).where(AccessToken.token_hash == bindparam("token_hash"))
+_REFRESH_TOKEN_BY_HASH = select(RefreshToken).where(RefreshToken.token_hash == bindparam("token_hash"))
 
-async def authenticate_client(db: AsyncSession, client_id: str, client_secret: str) -> Optional[OAuthApp]:
+
+async def authenticate_client(db: AsyncSession, client_id: str, client_secret: str) -> Optional[AppSnapshot]:
     from app.services.app_service import get_app_by_client_id
 
     app = await get_app_by_client_id(db, client_id)
     if not app:
         return None
-    if not verify_client_secret(client_secret, app.client_secret_hash):
+    if credential_cache.is_verified(client_id, client_secret, app.client_secret_hash):
+        return app
+    if not await verify_client_secret_async(client_secret, app.client_secret_hash):
         return None
+    credential_cache.remember(client_id, client_secret, app.client_secret_hash)
     return app
 
 
-async def issue_token(db: AsyncSession, app: OAuthApp, requested_scopes: List[str]) -> Tuple[str, int]:
+async def _store_access_token(
+    db: AsyncSession, token: str, jti: str, exp: int, commit: bool = True, **fields
+) -> None:
+    row = dict(
+        token_hash=hash_token(token),
+        jti=jti,
+        expires_at=datetime.fromtimestamp(exp, tz=timezone.utc),
+        **fields,
+    )
+    if token_writer.enabled():
+        token_writer.enqueue(row)
+        return
+    db.add(AccessToken(**row))
+    if commit:
+        await db.commit()
+
+
+async def issue_token(db: AsyncSession, app: AppSnapshot, requested_scopes: List[str]) -> Tuple[str, int]:
     if app.scopes:
-        granted = [s for s in requested_scopes if s in app.scopes] if requested_scopes else app.scopes
+        granted = [s for s in requested_scopes if s in app.scope_set] if requested_scopes else list(app.scopes)
     else:
         granted = requested_scopes or []
 
@@ -51,49 +83,104 @@ async def issue_token(db: AsyncSession, app: OAuthApp, requested_scopes: List[st
         "client_id": app.client_id,
     }
 
-    private_key = get_private_key()
-    token = jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": get_kid()})
-
-    token_record = AccessToken(
-        token_hash=hash_token(token),
-        jti=jti,
-        client_id=app.client_id,
-        scopes=granted,
-        expires_at=datetime.fromtimestamp(exp, tz=timezone.utc),
-    )
-    db.add(token_record)
-    await db.commit()
+    token = sign_jwt(claims, alg=app.token_signing_alg)
+    await _store_access_token(db, token, jti, exp, client_id=app.client_id, user_id=None, scopes=granted)
 
     return token, settings.token_expiry_seconds
 
 
 async def introspect_token(db: AsyncSession, token: str) -> Dict:
+    """RFC 7662 introspection result (token_type is added by bearer_response).
+
+    On a read replica, a missing row is re-read from the primary only for a
+    token issued within the replica lag window.
+    """
     token_h = hash_token(token)
-    result = await db.execute(select(AccessToken).where(AccessToken.token_hash == token_h))
-    record = result.scalar_one_or_none()
+    pending = token_writer.get_pending(token_h)
+    if pending is not None:
+        # Queued by write-behind and not committed yet
+        row = tuple(pending.get(name) for name in _INTROSPECT_COLUMNS)
+    else:
+        result = await db.execute(_INTROSPECT_BY_HASH, {"token_hash": token_h})
+        row = result.first()
+        if row is None and is_read_replica(db) and _may_not_have_replicated(token):
+            async with async_session() as primary:
+                row = (await primary.execute(_INTROSPECT_BY_HASH, {"token_hash": token_h})).first()
 
-    if not record:
+    if row is None:
         return {"active": False}
 
-    now = datetime.now(timezone.utc)
-    if record.revoked or record.expires_at < now:
+    scopes, client_id, user_id, revoked, expires_at, created_at, jti = row
+    if revoked or expires_at < datetime.now(timezone.utc):
+        return {"active": False}
+
+    return {
+        "active": True,
+        "scope": " ".join(scopes),
+        "client_id": client_id,
+        "user_id": str(user_id) if user_id else None,
+        "exp": int(expires_at.timestamp()),
+        "iat": int(created_at.timestamp()),
+        "jti": jti,
+        "iss": settings.issuer,
+    }
+
+
+def _may_not_have_replicated(token: str) -> bool:
+    """True for one of our tokens issued within the replica lag window.
+
+    Only these are worth re-checking on the primary when a replica has no
+    row; expired, revoked or forged tokens never are.
+    """
+    payload = verify_jwt(token)
+    iat = payload.get("iat") if payload else None
+    if not isinstance(iat, (int, float)):
+        return False
+    # Lag is sampled once per check interval and iat is whole seconds
+    window = settings.read_replica_max_lag_seconds + settings.read_replica_check_interval_seconds + 1
+    return time.time() - iat <= window
+
+
+async def verify_token_locally(db: AsyncSession, token: str) -> Dict:
+    """Validate an access token from its signature, exp and the revoked-jti set.
+
+    Same result shape as introspect_token, without the access_tokens lookup.
+    Revocations made on other workers are seen after the next set sync.
+    """
+    payload = verify_jwt(token)
+    if payload is None or payload.get("iss") != settings.issuer:
+        return {"active": False}
+    exp = payload.get("exp")
+    if not isinstance(exp, int) or exp <= datetime.now(timezone.utc).timestamp():
+        return {"active": False}
+
+    # ID tokens share the signing key but carry no jti/client_id
+    jti = payload.get("jti")
+    if not jti or not payload.get("client_id"):
+        return {"active": False}
+    if revocation_service.is_revoked(jti):
+        return {"active": False}
+    # Deleting an app cascades to its token rows; the registry lookup (a dict
+    # hit once warm, dropped on oauth_app_changed) stands in for that here
+    from app.services.app_service import get_app_by_client_id
+    if await get_app_by_client_id(db, payload["client_id"]) is None:
         return {"active": False}
 
     return {
         "active": True,
-        "scope": " ".join(record.scopes),
-        "client_id": record.client_id,
-        "user_id": str(record.user_id) if record.user_id else None,
-        "token_type": "Bearer",
-        "exp": int(record.expires_at.timestamp()),
-        "iat": int(record.created_at.timestamp()),
-        "jti": record.jti,
+        "scope": payload.get("scope", ""),
+        "client_id": payload["client_id"],
+        "user_id": payload.get("user_id"),
+        "exp": payload["exp"],
+        "iat": payload.get("iat"),
+        "jti": jti,
         "iss": settings.issuer,
     }
 
 
 async def issue_user_token(
-    db: AsyncSession, app: OAuthApp, user_id: uuid.UUID, granted_scopes: List[str]
+    db: AsyncSession, app: AppSnapshot, user_id: uuid.UUID, granted_scopes: List[str],
+    commit: bool = True,
 ) -> Tuple[str, int]:
     now = datetime.now(timezone.utc)
     exp = int(now.timestamp()) + settings.token_expiry_seconds
@@ -111,25 +198,17 @@ async def issue_user_token(
         "user_id": str(user_id),
     }
 
-    private_key = get_private_key()
-    token = jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": get_kid()})
-
-    token_record = AccessToken(
-        token_hash=hash_token(token),
-        jti=jti,
-        client_id=app.client_id,
-        user_id=user_id,
-        scopes=granted_scopes,
-        expires_at=datetime.fromtimestamp(exp, tz=timezone.utc),
+    token = sign_jwt(claims, alg=app.token_signing_alg)
+    await _store_access_token(
+        db, token, jti, exp, commit=commit,
+        client_id=app.client_id, user_id=user_id, scopes=granted_scopes,
     )
-    db.add(token_record)
-    await db.commit()
 
     return token, settings.token_expiry_seconds
 
 
 async def issue_id_token(
-    db: AsyncSession, app: OAuthApp, user: "User", granted_scopes: List[str],
+    db: AsyncSession, app: AppSnapshot, user: "User", granted_scopes: List[str],
     nonce: Optional[str] = None,
 ) -> str:
     now = datetime.now(timezone.utc)
@@ -170,13 +249,13 @@ async def issue_id_token(
     )
     claims.update(resolved)
 
-    private_key = get_private_key()
-    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": get_kid()})
+    return sign_jwt(claims, alg=app.token_signing_alg)
 
 
 async def issue_refresh_token(
-    db: AsyncSession, app: OAuthApp, user_id: uuid.UUID, granted_scopes: List[str],
+    db: AsyncSession, app: AppSnapshot, user_id: uuid.UUID, granted_scopes: List[str],
     family_id: Optional[uuid.UUID] = None,
+    commit: bool = True,
 ) -> Tuple[str, int]:
     token_value = secrets.token_urlsafe(48)
     jti = str(uuid.uuid4())
@@ -197,18 +276,57 @@ async def issue_refresh_token(
         family_id=family_id,
     )
     db.add(record)
-    await db.commit()
+    if commit:
+        await db.commit()
 
     return token_value, settings.refresh_token_expiry_seconds
 
 
+async def issue_authorization_code_tokens(
+    db: AsyncSession, app: AppSnapshot, auth_code: "AuthorizationCode"
+) -> Dict:
+    """Build the authorization_code grant token response with a single commit.
+
+    token_type is added when the body is serialized (see bearer_response).
+
+    The code (consumed by exchange_authorization_code with commit=False), the
+    access token row and the refresh token row are committed together.
+    """
+    granted_scopes = auth_code.scope.split() if auth_code.scope else []
+    access_token, expires_in = await issue_user_token(
+        db, app, auth_code.user_id, granted_scopes, commit=False
+    )
+
+    response_body = {
+        "access_token": access_token,
+        "expires_in": expires_in,
+        "scope": auth_code.scope,
+    }
+
+    if "offline_access" in granted_scopes:
+        rt, _ = await issue_refresh_token(
+            db, app, auth_code.user_id, granted_scopes, commit=False
+        )
+        response_body["refresh_token"] = rt
+
+    await db.commit()
+
+    # ID token is signed only — no rows to write
+    if "openid" in granted_scopes:
+        user = await user_service.get_user_by_id(db, auth_code.user_id)
+        if user:
+            response_body["id_token"] = await issue_id_token(
+                db, app, user, granted_scopes, nonce=auth_code.nonce
+            )
+
+    return response_body
+
+
 async def exchange_refresh_token(
     db: AsyncSession, refresh_token_str: str, client_id: str
 ) -> Optional[Dict]:
     token_h = hash_token(refresh_token_str)
-    result = await db.execute(
-        select(RefreshToken).where(RefreshToken.token_hash == token_h)
-    )
+    result = await db.execute(_REFRESH_TOKEN_BY_HASH, {"token_hash": token_h})
     record = result.scalar_one_or_none()
 
     if not record:
@@ -251,7 +369,6 @@ async def exchange_refresh_token(
     return {
         "access_token": access_token,
         "refresh_token": new_refresh_token,
-        "token_type": "Bearer",
         "expires_in": expires_in,
         "scope": " ".join(granted_scopes),
         "user_id": record.user_id,
@@ -261,16 +378,23 @@ async def exchange_refresh_token(
 async def revoke_token(db: AsyncSession, token: str) -> bool:
     token_h = hash_token(token)
 
+    # Check tokens still queued by write-behind
+    jti = token_writer.revoke_pending(token_h)
+    if jti is not None:
+        revocation_service.mark_revoked(jti)
+        return True
+
     # Check access tokens
-    result = await db.execute(select(AccessToken).where(AccessToken.token_hash == token_h))
+    result = await db.execute(_ACCESS_TOKEN_BY_HASH, {"token_hash": token_h})
     record = result.scalar_one_or_none()
     if record:
         record.revoked = True
         await db.commit()
+        revocation_service.mark_revoked(record.jti)
         return True
 
     # Check refresh tokens
-    result = await db.execute(select(RefreshToken).where(RefreshToken.token_hash == token_h))
+    result = await db.execute(_REFRESH_TOKEN_BY_HASH, {"token_hash": token_h})
     record = result.scalar_one_or_none()
     if record:
         record.revoked = True
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+
+from app import metrics
+from app.config import settings
+from app.models.access_token import AccessToken
+
+logger = logging.getLogger(__name__)
+
+# Write-behind queue for access_tokens rows. Rows stay in _pending (keyed by
+# token_hash) until their batch commits, so introspection and revocation on
+# this worker see them in the meantime.
+_pending = {}  # type: Dict[str, Dict[str, Any]]
+_wakeup = None  # type: Optional[asyncio.Event]
+_flush_task = None  # type: Optional[asyncio.Task]
+_stats = {"enqueued": 0, "flushed": 0, "batches": 0, "failed_batches": 0, "dropped": 0}
+
+
+def enabled() -> bool:
+    return settings.token_write_behind and _flush_task is not None
+
+
+def enqueue(fields: Dict[str, Any]) -> None:
+    row = {
+        "id": uuid.uuid4(),
+        "revoked": False,
+        "created_at": datetime.now(timezone.utc),
+        **fields,
+    }
+    _pending[row["token_hash"]] = row
+    _stats["enqueued"] += 1
+    if len(_pending) >= settings.token_write_behind_batch_size and _wakeup is not None:
+        _wakeup.set()
+
+
+def get_pending(token_hash: str) -> Optional[Dict[str, Any]]:
+    return _pending.get(token_hash)
+
+
+def revoke_pending(token_hash: str) -> Optional[str]:
+    """Mark a queued token revoked. Returns its jti, or None if not queued."""
+    row = _pending.get(token_hash)
+    if row is None:
+        return None
+    row["revoked"] = True
+    return row["jti"]
+
+
+def revoke_pending_for(client_id: str, user_id: uuid.UUID) -> List[str]:
+    """Mark every queued token for a client+user revoked. Returns their jtis."""
+    jtis = []
+    for row in _pending.values():
+        if row["client_id"] == client_id and row["user_id"] == user_id:
+            row["revoked"] = True
+            jtis.append(row["jti"])
+    return jtis
+
+
+async def _insert_rows_individually(rows: List[Dict[str, Any]]) -> None:
+    # One bad row (e.g. its app was deleted meanwhile) must not wedge the batch
+    from app.database import async_session
+
+    for row in rows:
+        async with async_session() as db:
+            try:
+                await db.execute(insert(AccessToken).values(row))
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                _stats["dropped"] += 1
+                logger.warning("Dropping queued access token %s: integrity error", row["jti"])
+
+
+async def flush() -> int:
+    """Insert up to one batch of queued rows with a single multi-row INSERT."""
+    from app.database import async_session
+
+    rows = list(_pending.values())[: settings.token_write_behind_batch_size]
+    if not rows:
+        return 0
+    revoked_at_insert = [row["revoked"] for row in rows]
+
+    try:
+        async with async_session() as db:
+            await db.execute(insert(AccessToken).values(rows))
+            await db.commit()
+    except IntegrityError:
+        _stats["failed_batches"] += 1
+        await _insert_rows_individually(rows)
+    else:
+        _stats["batches"] += 1
+
+    # The rows are committed: from here on revoke_token updates them in the
+    # DB. Dequeue before the next await so no revocation can land on a row
+    # that is about to be dropped from _pending.
+    for row in rows:
+        _pending.pop(row["token_hash"], None)
+    _stats["flushed"] += len(rows)
+
+    # Revocations that landed while the INSERT was in flight
+    late = [row["token_hash"] for row, was in zip(rows, revoked_at_insert) if row["revoked"] and not was]
+    if late:
+        async with async_session() as db:
+            await db.execute(
+                update(AccessToken).where(AccessToken.token_hash.in_(late)).values(revoked=True)
+            )
+            await db.commit()
+    return len(rows)
+
+
+async def _flush_loop() -> None:
+    interval = settings.token_write_behind_interval_ms / 1000
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        try:
+            await flush()
+        except Exception:
+            _stats["failed_batches"] += 1
+            logger.exception("Access token write-behind flush failed; will retry")
+        if len(_pending) >= settings.token_write_behind_batch_size:
+            _wakeup.set()
+
+
+def start() -> None:
+    global _wakeup, _flush_task
+    if _flush_task is None:
+        _wakeup = asyncio.Event()
+        _flush_task = asyncio.create_task(_flush_loop())
+
+
+async def stop() -> None:
+    """Stop the flush loop and drain whatever is still queued."""
+    global _flush_task
+    if _flush_task is None:
+        return
+    _flush_task.cancel()
+    try:
+        await _flush_task
+    except asyncio.CancelledError:
+        pass
+    _flush_task = None
+    while _pending:
+        try:
+            await flush()
+        except Exception:
+            logger.exception("Dropping %d queued access tokens at shutdown", len(_pending))
+            break
+
+
+def get_stats() -> dict:
+    return dict(_stats, pending=len(_pending))
+
+
+metrics.register("token_write_behind", get_stats)
@@ -3,18 +3,21 @@ from __future__ import annotations
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
 
+# Built once; SQLAlchemy caches the compiled SQL on first use
+_USER_BY_DISCORD_ID = select(User).where(User.discord_id == bindparam("discord_id"))
+
 
 async def get_user_by_id(db: AsyncSession, user_id: UUID) -> Optional[User]:
     return await db.get(User, user_id)
 
 
 async def get_user_by_discord_id(db: AsyncSession, discord_id: str) -> Optional[User]:
-    result = await db.execute(select(User).where(User.discord_id == discord_id))
+    result = await db.execute(_USER_BY_DISCORD_ID, {"discord_id": discord_id})
     return result.scalar_one_or_none()
 
 
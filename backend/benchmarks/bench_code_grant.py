@@ -0,0 +1,97 @@
+"""Benchmark: authorization_code grant token issuance latency.
+
+Compares the per-step commit path (code, access token and refresh token
+each committed separately) with token_service.issue_authorization_code_tokens
+(one commit). Needs a migrated database at OAUTH_DATABASE_URL; creates a
+throwaway app and user and deletes them afterwards.
+
+Run from backend/:  python -m benchmarks.bench_code_grant [iterations]
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import os
+import statistics
+import sys
+import time
+import uuid
+
+os.environ.setdefault("OAUTH_SESSION_SECRET", "benchmark")
+
+from app.database import async_session, engine  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import app_service, authz_service, token_service  # noqa: E402
+
+REDIRECT_URI = "https://bench.example.com/callback"
+SCOPE = "offline_access"  # no openid: the ID token does no DB writes
+VERIFIER = "bench-verifier-" + "x" * 40
+CHALLENGE = base64.urlsafe_b64encode(hashlib.sha256(VERIFIER.encode()).digest()).rstrip(b"=").decode()
+
+
+async def _new_code(db, client_id: str, user_id: uuid.UUID) -> str:
+    return await authz_service.create_authorization_code(
+        db, client_id, user_id, REDIRECT_URI, SCOPE,
+        code_challenge=CHALLENGE, code_challenge_method="S256",
+    )
+
+
+async def _per_step_commits(db, app, code: str) -> None:
+    auth_code = await authz_service.exchange_authorization_code(
+        db, code, app.client_id, REDIRECT_URI, VERIFIER
+    )
+    scopes = auth_code.scope.split()
+    await token_service.issue_user_token(db, app, auth_code.user_id, scopes)
+    await token_service.issue_refresh_token(db, app, auth_code.user_id, scopes)
+
+
+async def _single_commit(db, app, code: str) -> None:
+    auth_code = await authz_service.exchange_authorization_code(
+        db, code, app.client_id, REDIRECT_URI, VERIFIER, commit=False
+    )
+    await token_service.issue_authorization_code_tokens(db, app, auth_code)
+
+
+async def _measure(label: str, fn, client_id: str, user_id: uuid.UUID, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        async with async_session() as db:
+            code = await _new_code(db, client_id, user_id)
+        async with async_session() as db:
+            app = await app_service.get_app_by_client_id(db, client_id)
+            start = time.perf_counter()
+            await fn(db, app, code)
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p50 = statistics.median(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"  {label:<22} p50 {p50:7.2f} ms   p95 {p95:7.2f} ms")
+    return p50
+
+
+async def main(iterations: int) -> None:
+    async with async_session() as db:
+        user = User(discord_id=f"bench-{uuid.uuid4().hex[:16]}")
+        db.add(user)
+        await db.commit()
+        app, _ = await app_service.create_app(
+            db, "bench", None, [], [REDIRECT_URI], owner_id=user.id
+        )
+        client_id, app_id, user_id = app.client_id, app.id, user.id
+
+    try:
+        print(f"authorization_code grant, {iterations} iterations")
+        before = await _measure("per-step commits", _per_step_commits, client_id, user_id, iterations)
+        after = await _measure("single commit", _single_commit, client_id, user_id, iterations)
+        print(f"  p50 saved: {before - after:.2f} ms")
+    finally:
+        async with async_session() as db:
+            await app_service.delete_app(db, app_id)
+            await db.delete(await db.get(User, user_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
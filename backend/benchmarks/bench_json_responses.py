@@ -0,0 +1,84 @@
+"""Micro-benchmark: response serialization on the OAuth hot endpoints.
+
+Compares what FastAPI does with a returned dict (jsonable_encoder, then
+JSONResponse / stdlib json) against app.responses (orjson, with the
+"token_type":"Bearer" fragment pre-encoded) for /token, /introspect and
+/userinfo bodies.
+
+Run from backend/:  python -m benchmarks.bench_json_responses
+"""
+from __future__ import annotations
+
+import os
+import time
+import uuid
+
+os.environ.setdefault("OAUTH_SESSION_SECRET", "benchmark")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.responses import FastJSONResponse, bearer_response  # noqa: E402
+
+DURATION = 2.0  # seconds per variant
+
+# Realistically sized bodies (RS256 JWTs are ~700-900 bytes)
+JWT = "eyJhbGciOiJSUzI1NiIsImtpZCI6ImFiYyIsInR5cCI6IkpXVCJ9." + "x" * 600 + "." + "y" * 342
+TOKEN = {"access_token": JWT, "expires_in": 3600, "scope": "openid profile email roles", "id_token": JWT}
+INTROSPECTION = {
+    "active": True,
+    "scope": "openid profile email roles",
+    "client_id": "ns_" + "a" * 32,
+    "user_id": str(uuid.uuid4()),
+    "exp": 1760000000,
+    "iat": 1759996400,
+    "jti": str(uuid.uuid4()),
+    "iss": "https://auth.example.com",
+}
+USERINFO = {
+    "sub": str(uuid.uuid4()),
+    "email": "alice@networkschool.com",
+    "email_verified": True,
+    "name": "Alice",
+    "picture": "https://cdn.discordapp.com/avatars/123456789012345678/a_abcdef.gif",
+    "roles": [{"id": str(1000 + i), "name": f"Role {i}"} for i in range(8)],
+    "date_joined": "2024-01-01T00:00:00+00:00",
+    "discord_username": "alice",
+    "public_badges": ["Active Developer", "HypeSquad Balance"],
+}
+
+
+def _fastapi_default(body: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(body)).body
+
+
+def _run(label: str, fn, body: dict) -> float:
+    fn(body)  # warm-up
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        fn(body)
+        count += 1
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / count * 1e6
+    print(f"  {label:<34} {per_call_us:8.2f} µs/response")
+    return per_call_us
+
+
+def main():
+    cases = [
+        ("/oauth/token", TOKEN, lambda body: bearer_response(body).body, "bearer_response (orjson)"),
+        ("/oauth/token/introspect", INTROSPECTION, lambda body: bearer_response(body).body, "bearer_response (orjson)"),
+        ("/oauth/userinfo", USERINFO, lambda body: FastJSONResponse(body).body, "FastJSONResponse (orjson)"),
+    ]
+    for route, body, fast, label in cases:
+        print(f"{route}")
+        # The default path includes token_type in the dict itself
+        default_body = dict(body, token_type="Bearer") if label.startswith("bearer") else body
+        before = _run("jsonable_encoder + JSONResponse", _fastapi_default, default_body)
+        after = _run(label, fast, body)
+        print(f"  saved: {before - after:.2f} µs/response ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Micro-benchmark: per-call statement overhead of the hot lookups.
+
+SQLAlchemy caches compiled SQL, but every execute() still pays for building
+the select() (when built inline) and for generating its cache key. Compares,
+per lookup, building the statement inline, a module-level statement with a
+bindparam (what the services use), and lambda_stmt. Runs without a database.
+
+Run from backend/:  python -m benchmarks.bench_statements
+"""
+from __future__ import annotations
+
+import os
+import time
+
+os.environ.setdefault("OAUTH_SESSION_SECRET", "benchmark")
+
+from sqlalchemy import bindparam, lambda_stmt, select  # noqa: E402
+
+from app.models.access_token import AccessToken  # noqa: E402
+from app.models.oauth_app import OAuthApp  # noqa: E402
+from app.services import token_service  # noqa: E402
+
+DURATION = 2.0  # seconds per variant
+TOKEN_HASH = "a" * 64
+CLIENT_ID = "ns_" + "b" * 32
+
+_PREBUILT_APP = select(OAuthApp).where(OAuthApp.client_id == bindparam("client_id"))
+
+
+def _inline_introspect():
+    return select(AccessToken).where(AccessToken.token_hash == TOKEN_HASH)._generate_cache_key()
+
+
+def _prebuilt_introspect():
+    # Column-only select used by introspect_token
+    return token_service._INTROSPECT_BY_HASH._generate_cache_key()
+
+
+def _lambda_introspect():
+    token_hash = TOKEN_HASH
+    stmt = lambda_stmt(lambda: select(AccessToken).where(AccessToken.token_hash == token_hash))
+    return stmt._generate_cache_key()
+
+
+def _inline_app():
+    return select(OAuthApp).where(OAuthApp.client_id == CLIENT_ID)._generate_cache_key()
+
+
+def _prebuilt_app():
+    return _PREBUILT_APP._generate_cache_key()
+
+
+def _run(label: str, fn) -> float:
+    fn()  # warm-up (lambda_stmt analyses the lambda on first use)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        fn()
+        count += 1
+    per_call_us = (time.perf_counter() - start) / count * 1e6
+    print(f"  {label:<34} {per_call_us:8.2f} µs/call")
+    return per_call_us
+
+
+def main():
+    print("introspect_token lookup (statement + cache key)")
+    inline = _run("inline select(AccessToken)", _inline_introspect)
+    _run("lambda_stmt", _lambda_introspect)
+    prebuilt = _run("prebuilt column select", _prebuilt_introspect)
+    print(f"  saved: {inline - prebuilt:.2f} µs/call")
+
+    print("get_app_by_client_id lookup (statement + cache key)")
+    inline = _run("inline select(OAuthApp)", _inline_app)
+    prebuilt = _run("prebuilt select + bindparam", _prebuilt_app)
+    print(f"  saved: {inline - prebuilt:.2f} µs/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Pre-fill the Discord member cache for every user in the database.
+
+Only useful with a shared cache backend (OAUTH_DISCORD_CACHE_BACKEND=sqlite
+or redis); the in-memory cache dies with this process.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from app.services import discord_service, discord_warmup
+
+
+async def warm():
+    try:
+        stats = await discord_warmup.warm_member_cache()
+    finally:
+        await discord_service.close_client()
+    print(f"Cached {stats['cached']}/{stats['users']} users "
+          f"({stats['scanned']} guild members scanned in {stats['pages']} pages)")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(warm())